@@ -0,0 +1,75 @@
+"""Add song full-text search index
+
+Revision ID: 5f2c8d1e9a47
+Revises: abe7139ca849
+Create Date: 2026-10-18 10:12:41.218903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c8d1e9a47'
+down_revision: Union[str, Sequence[str], None] = 'abe7139ca849'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_SQLITE_FTS_MATCH_OLD = (
+    "SELECT rowid FROM songs_fts WHERE songs_fts MATCH "
+    "'track_id:\"' || replace(old.track_id, '\"', '\"\"') || '\"' "
+    "AND track_id = old.track_id"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE songs_fts USING fts5("
+            "track_id, track_name, track_artist, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER songs_fts_insert AFTER INSERT ON songs BEGIN "
+            "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+            "VALUES (new.track_id, new.track_name, new.track_artist); END"
+        )
+        op.execute(
+            "CREATE TRIGGER songs_fts_delete AFTER DELETE ON songs BEGIN "
+            f"DELETE FROM songs_fts WHERE rowid IN ({_SQLITE_FTS_MATCH_OLD}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER songs_fts_update "
+            "AFTER UPDATE OF track_id, track_name, track_artist ON songs BEGIN "
+            f"DELETE FROM songs_fts WHERE rowid IN ({_SQLITE_FTS_MATCH_OLD}); "
+            "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+            "VALUES (new.track_id, new.track_name, new.track_artist); END"
+        )
+        op.execute(
+            "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+            "SELECT track_id, track_name, track_artist FROM songs"
+        )
+    elif dialect == "postgresql":
+        op.create_index(
+            "ix_songs_search",
+            "songs",
+            [sa.text("to_tsvector('simple', track_name || ' ' || track_artist)")],
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS songs_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS songs_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS songs_fts_insert")
+        op.execute("DROP TABLE IF EXISTS songs_fts")
+    elif dialect == "postgresql":
+        op.drop_index("ix_songs_search", table_name="songs")
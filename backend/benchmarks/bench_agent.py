@@ -0,0 +1,150 @@
+"""Per-request cost of the song features agent: built per request versus shared.
+
+A local stub of the Gemini `generateContent` endpoint is served with uvicorn
+(over TLS with a throwaway self-signed certificate when `openssl` is
+available), and a `/recommend/text`-style call is timed with a new
+`SongFeaturesAgent` per request, as `get_song_feature_agent` used to do, and
+with one shared agent. The construction itself and the TCP connections the
+stub accepted are reported for both.
+
+Most of the construction cost is the provider's new HTTP client loading the
+CA bundle, so it is measured best with --no-tls: over TLS the fresh clients
+only load the stub's one certificate.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_agent --calls 300
+    uv run python -m benchmarks.bench_agent --no-tls
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import uvicorn
+
+# Before pydantic_ai is imported
+os.environ.setdefault("PYDANTIC_AI_NO_BANNER", "1")
+from src.agents.song_feature_agent import SongFeaturesAgent
+from src.core.config import settings
+
+from benchmarks.bench_http_clients import free_port, report, self_signed_certificate
+
+_FEATURES = {
+    "danceability": 0.3,
+    "energy": 0.2,
+    "key": 0,
+    "loudness": -12.0,
+    "mode": 1,
+    "speechiness": 0.04,
+    "acousticness": 0.8,
+    "instrumentalness": 0.9,
+    "liveness": 0.1,
+    "valence": 0.4,
+    "tempo": 75.0,
+}
+_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {
+                "content": {
+                    "role": "model",
+                    "parts": [
+                        {"functionCall": {"name": "final_result", "args": _FEATURES}}
+                    ],
+                },
+                "finishReason": "STOP",
+            }
+        ],
+        "usageMetadata": {"promptTokenCount": 500, "candidatesTokenCount": 50},
+        "modelVersion": settings.MODEL,
+    }
+).encode()
+
+
+class StubGemini:
+    def __init__(self):
+        # One entry per TCP connection the server accepted
+        self.connections: set[tuple[str, int]] = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.connections.add(tuple(scope["client"]))
+        while (await receive()).get("more_body"):
+            pass
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": _RESPONSE})
+
+
+async def measure(agent_for_call, calls: int) -> tuple[list[float], list[float]]:
+    timings, construction = [], []
+    for _ in range(calls):
+        start = time.perf_counter()
+        agent = agent_for_call()
+        construction.append(time.perf_counter() - start)
+        await agent("relaxing music to concentrate while studying")
+        timings.append(time.perf_counter() - start)
+    return timings, construction
+
+
+async def main(calls: int, tls: bool) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        certificate = self_signed_certificate(workdir) if tls else None
+        port = free_port()
+        stub = StubGemini()
+        config = uvicorn.Config(
+            stub,
+            host="127.0.0.1",
+            port=port,
+            log_level="error",
+            ssl_certfile=certificate[0] if certificate else None,
+            ssl_keyfile=certificate[1] if certificate else None,
+        )
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        scheme = "https" if certificate else "http"
+        base_url = f"{scheme}://localhost:{port}"
+        if certificate:
+            # Trusted by the provider's HTTP client through the CA bundle
+            os.environ["SSL_CERT_FILE"] = certificate[0]
+        settings.GOOGLE_API_KEY = settings.GOOGLE_API_KEY or "benchmark"
+        print(f"Stub Gemini at {base_url}, {calls} calls per agent")
+
+        shared = SongFeaturesAgent(base_url=base_url)
+        async with shared.agent:
+            for name, agent_for_call in (
+                ("agent per call", lambda: SongFeaturesAgent(base_url=base_url)),
+                ("shared agent", lambda: shared),
+            ):
+                stub.connections.clear()
+                timings, construction = await measure(agent_for_call, calls)
+                report(name, timings)
+                print(
+                    f"{'':<14} construction p50 "
+                    f"{sorted(construction)[len(construction) // 2] * 1000:7.2f} ms"
+                    f"  connections {len(stub.connections)}"
+                )
+
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--no-tls", dest="tls", action="store_false")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.tls))
@@ -0,0 +1,159 @@
+"""/songs latency during bursts of recommendation requests, with and without the pool.
+
+The app is driven in-process through httpx's ASGI transport against a
+synthetic SQLite catalogue. A steady stream of GET /songs requests is timed
+while, every `--pause` seconds, `--clients` POST /recommend/batch requests
+with random seeds (so the recommendation cache never answers) arrive at
+once: first with the kNN queries run inline on the event loop, as before
+the compute pool, then in `recommender_pool`.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_event_loop --songs 200000
+    uv run python -m benchmarks.bench_event_loop --clients 16 --batch 32 --pause 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+from httpx import ASGITransport, AsyncClient
+from main import app
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.api.dependencies import (
+    get_db_session,
+    get_recommendation_cache,
+    get_recommendation_index,
+    get_recommender_pool,
+)
+from src.core.config import settings
+from src.repositories.feature_store import FeatureStore
+from src.repositories.song_repository import SongRepository
+from src.services.recommendation_cache import RecommendationCache
+from src.services.recommendation_index import RecommendationIndex
+from src.services.recommender_service import recommender_pool
+from src.utils.concurrency import ComputePool
+
+from benchmarks.bench_http_clients import report
+from benchmarks.catalogue import populate
+
+
+async def recommend(client: AsyncClient, n_songs: int, batch: int) -> bool:
+    """One batch request with random seeds; False when it was shed with a 503."""
+    rng = np.random.default_rng()
+    body = [
+        {"song_ids": [f"track_{i}" for i in rng.integers(0, n_songs, 3)]}
+        for _ in range(batch)
+    ]
+    response = await client.post(f"{settings.API_V1_STR}/recommend/batch", json=body)
+    if response.status_code == 503:
+        return False
+    response.raise_for_status()
+    return True
+
+
+async def bursts(
+    client: AsyncClient,
+    n_songs: int,
+    clients: int,
+    batch: int,
+    pause: float,
+    stop: asyncio.Event,
+) -> tuple[int, int]:
+    """Send `clients` batches at once every `pause` seconds until `stop`."""
+    answered = rejected = 0
+    while not stop.is_set():
+        results = await asyncio.gather(
+            *(recommend(client, n_songs, batch) for _ in range(clients))
+        )
+        answered += sum(results)
+        rejected += len(results) - sum(results)
+        await asyncio.sleep(pause)
+    return answered, rejected
+
+
+async def measure_songs(client: AsyncClient, requests: int) -> list[float]:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(f"{settings.API_V1_STR}/songs/?limit=20")
+        response.raise_for_status()
+        timings.append(time.perf_counter() - start)
+        # Paced like a client browsing the catalogue, not a saturating loop
+        await asyncio.sleep(0.005)
+    return timings
+
+
+async def scenario(
+    client: AsyncClient, n_songs: int, args: argparse.Namespace
+) -> tuple[list[float], int, int]:
+    stop = asyncio.Event()
+    load = asyncio.create_task(
+        bursts(client, n_songs, args.clients, args.batch, args.pause, stop)
+    )
+    timings = await measure_songs(client, args.requests)
+    stop.set()
+    answered, rejected = await load
+    return timings, answered, rejected
+
+
+def use_pool(pool: ComputePool | None):
+    async def get_pool() -> ComputePool | None:
+        return pool
+
+    return get_pool
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{workdir}/catalogue.db")
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        await populate(engine, args.songs)
+        index = RecommendationIndex(FeatureStore(os.path.join(workdir, "features")))
+        async with session_factory() as session:
+            await index.build(SongRepository(session))
+
+        async def override_get_db_session():
+            async with session_factory() as session:
+                yield session
+
+        # A cache that never holds an entry, so every query reaches the index
+        no_cache = RecommendationCache(1, 0, settings.RECOMMENDATION_CACHE_QUANTUM)
+        app.dependency_overrides[get_db_session] = override_get_db_session
+        app.dependency_overrides[get_recommendation_index] = lambda: index
+        app.dependency_overrides[get_recommendation_cache] = lambda: no_cache
+
+        print(
+            f"{args.songs} songs, bursts of {args.clients} batches of {args.batch} "
+            f"every {args.pause}s, {args.requests} GET /songs, "
+            f"{recommender_pool.max_workers} pool workers"
+        )
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            idle = argparse.Namespace(**{**vars(args), "clients": 0})
+            timings, _, _ = await scenario(client, args.songs, idle)
+            report("idle", timings)
+            for name, pool in (("inline", None), ("compute pool", recommender_pool)):
+                app.dependency_overrides[get_recommender_pool] = use_pool(pool)
+                timings, answered, rejected = await scenario(client, args.songs, args)
+                report(name, timings)
+                print(f"{'':<14} batches answered {answered}  rejected {rejected}")
+
+        app.dependency_overrides.clear()
+        recommender_pool.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--pause", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,141 @@
+"""Per-call latency of the music API repositories: fresh client versus pooled.
+
+A local stub of the Deezer search endpoint is served with uvicorn (over TLS
+with a throwaway self-signed certificate when `openssl` is available), and
+`DeezerRepository.search_song` is timed with a new `httpx.AsyncClient` per
+call, as the repositories used to do, and with the shared pooled client.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_http_clients --calls 500
+    uv run python -m benchmarks.bench_http_clients --no-tls
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+import uvicorn
+from src.core.http_clients import create_http_client
+from src.repositories.deezer_repository import DeezerRepository
+
+_RESPONSE = b'{"data": [{"id": 1, "preview": "https://example.com/preview.mp3"}]}'
+
+
+async def stub_app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": _RESPONSE})
+
+
+def self_signed_certificate(directory: str) -> tuple[str, str] | None:
+    if shutil.which("openssl") is None:
+        return None
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def measure(repo_for_call, calls: int) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        async with repo_for_call() as repo:
+            await repo.search_song("Song", "Artist")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p = statistics.quantiles(ms, n=100, method="inclusive")
+    print(f"{name:<14} p50 {p[49]:7.2f} ms  p95 {p[94]:7.2f} ms  p99 {p[98]:7.2f} ms")
+
+
+async def main(calls: int, tls: bool) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        certificate = self_signed_certificate(workdir) if tls else None
+        port = free_port()
+        config = uvicorn.Config(
+            stub_app,
+            host="127.0.0.1",
+            port=port,
+            log_level="error",
+            ssl_certfile=certificate[0] if certificate else None,
+            ssl_keyfile=certificate[1] if certificate else None,
+        )
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        scheme = "https" if certificate else "http"
+        base_url = f"{scheme}://localhost:{port}"
+
+        def verify():
+            # A new client builds its SSL context too: from the system CA
+            # bundle in production, from the stub's certificate here.
+            if certificate:
+                return ssl.create_default_context(cafile=certificate[0])
+            return True
+
+        print(f"Stub server at {base_url}, {calls} calls per client")
+
+        class FreshClient:
+            async def __aenter__(self):
+                self.client = httpx.AsyncClient(base_url=base_url, verify=verify())
+                return DeezerRepository(self.client)
+
+            async def __aexit__(self, *exc):
+                await self.client.aclose()
+
+        pooled = create_http_client(base_url, verify=verify())
+
+        class PooledClient:
+            async def __aenter__(self):
+                return DeezerRepository(pooled)
+
+            async def __aexit__(self, *exc):
+                pass
+
+        report("fresh client", await measure(FreshClient, calls))
+        report("pooled client", await measure(PooledClient, calls))
+        await pooled.aclose()
+
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--no-tls", dest="tls", action="store_false")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.tls))
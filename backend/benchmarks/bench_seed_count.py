@@ -0,0 +1,101 @@
+"""Per-request cost of RecommenderService.recommend versus the number of seeds.
+
+Besides the whole request, its three stages are timed on their own:
+gathering the seeds (one hash lookup per seed, then a single mean over
+the gathered rows), the kNN query on that mean, and the responses. Only
+the first grows with the seed count, linearly and by under a microsecond
+per seed (about 8 ms for 10,000 seeds at 100,000 songs). The responses
+cost the same for any number of seeds. The kNN query depends on where the
+mean lands, not on how many seeds made it: one seed is a song of the
+catalogue, while the mean of many seeds falls near the centre of the
+catalogue, where the tree has more candidates to check (about 3.5 ms
+against 6.5 ms from 10 seeds up at 100,000 songs).
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_seed_count --songs 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+from src.domain.models.song import SongModel
+from src.services.recommendation_index import RecommendationIndex
+from src.services.recommender_service import RecommenderService
+
+from benchmarks.catalogue import synthetic_models
+
+
+class InMemorySongRepository:
+    """Serves a synthetic catalogue the way SongRepository would."""
+
+    def __init__(self, songs: list[SongModel]):
+        self.songs = {s.track_id: s for s in songs}
+
+    async def stream_features(self, features: list[str], batch_size: int = 10000):
+        songs = list(self.songs.values())
+        for i in range(0, len(songs), batch_size):
+            yield [
+                (s.track_id, *(getattr(s, f) for f in features))
+                for s in songs[i : i + batch_size]
+            ]
+
+    async def get_by_ids(self, track_ids: list[str]) -> list[SongModel]:
+        return [self.songs[t] for t in track_ids if t in self.songs]
+
+
+async def main(n_songs: int, seed_counts: list[int], repeats: int) -> None:
+    repo = InMemorySongRepository(synthetic_models(n_songs))
+    index = RecommendationIndex()
+    await index.build(repo)  # type: ignore[arg-type]
+    service = RecommenderService(repo, index)  # type: ignore[arg-type]
+    track_ids = list(repo.songs)
+    rng = np.random.default_rng(1)
+
+    print(f"{n_songs} songs, {repeats} requests per row, limit=10, p50 in ms")
+    print(
+        f"{'seeds':>8} {'request':>10} {'request p95':>12}"
+        f" {'seeds':>10} {'kNN query':>10} {'responses':>10}"
+    )
+    for n_seeds in seed_counts:
+        timings: dict[str, list[float]] = {
+            "request": [],
+            "seeds": [],
+            "query": [],
+            "responses": [],
+        }
+        for _ in range(repeats):
+            seeds = [track_ids[i] for i in rng.choice(len(track_ids), n_seeds)]
+            start = time.perf_counter()
+            await service.recommend(seeds, 10)
+            timings["request"].append((time.perf_counter() - start) * 1000)
+
+            # The same request, one stage at a time
+            start = time.perf_counter()
+            vectors, _ = index.seed_vectors([seeds])
+            timings["seeds"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            neighbors = index.query(vectors, 10)[0]
+            timings["query"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await service._responses_from_track_ids(neighbors)
+            timings["responses"].append((time.perf_counter() - start) * 1000)
+        p50 = {stage: statistics.median(values) for stage, values in timings.items()}
+        p95 = statistics.quantiles(timings["request"], n=20)[-1]
+        print(
+            f"{n_seeds:>8} {p50['request']:>10.3f} {p95:>12.3f}"
+            f" {p50['seeds']:>10.3f} {p50['query']:>10.3f} {p50['responses']:>10.3f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=100_000)
+    parser.add_argument(
+        "--seeds", type=int, nargs="+", default=[1, 10, 100, 1000, 10000]
+    )
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.songs, args.seeds, args.repeats))
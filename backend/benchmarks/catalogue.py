@@ -0,0 +1,80 @@
+"""Synthetic song catalogues with the `SongModel` schema for benchmarks."""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.domain.models.song import Base, SongModel
+
+
+def synthetic_catalogue(n_songs: int, seed: int = 0) -> pd.DataFrame:
+    """A DataFrame with one column per `SongModel` column, in CSV order."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_songs)
+    albums = ids // 12
+    artists = rng.integers(0, max(1, n_songs // 20), n_songs)
+
+    df = pd.DataFrame(
+        {
+            "track_id": np.char.add("track_", ids.astype(str)),
+            "track_name": np.char.add("Song ", ids.astype(str)),
+            "track_artist": np.char.add("Artist ", artists.astype(str)),
+            "track_popularity": rng.integers(0, 101, n_songs),
+            "track_album_id": np.char.add("album_", albums.astype(str)),
+            "track_album_name": np.char.add("Album ", albums.astype(str)),
+            "track_album_release_date": "2020-01-01",
+            "playlist_name": "Benchmark Playlist",
+            "playlist_id": "playlist_0",
+            "playlist_genre": rng.choice(["pop", "rock", "rap", "edm"], n_songs),
+            "playlist_subgenre": None,
+            "danceability": rng.random(n_songs),
+            "energy": rng.random(n_songs),
+            "key": rng.integers(0, 12, n_songs),
+            "loudness": rng.uniform(-30, 0, n_songs),
+            "mode": rng.integers(0, 2, n_songs),
+            "speechiness": rng.random(n_songs) * 0.5,
+            "acousticness": rng.random(n_songs),
+            "instrumentalness": rng.random(n_songs) ** 4,
+            "liveness": rng.random(n_songs) * 0.6,
+            "valence": rng.random(n_songs),
+            "tempo": rng.uniform(60, 200, n_songs),
+            "duration_ms": rng.integers(90_000, 400_000, n_songs),
+        }
+    )
+    return df[[c.name for c in SongModel.__table__.columns]]
+
+
+def synthetic_models(n_songs: int, seed: int = 0) -> list[SongModel]:
+    df = synthetic_catalogue(n_songs, seed).astype(object)
+    df = df.where(pd.notnull(df), None)
+    return [SongModel(**record) for record in df.to_dict("records")]
+
+
+def random_features(rng: np.random.Generator) -> dict:
+    """A `SongFeatures` payload drawn from the same ranges as the catalogue."""
+    return {
+        "danceability": rng.random(),
+        "energy": rng.random(),
+        "key": int(rng.integers(0, 12)),
+        "loudness": rng.uniform(-30, 0),
+        "mode": int(rng.integers(0, 2)),
+        "speechiness": rng.random() * 0.5,
+        "acousticness": rng.random(),
+        "instrumentalness": rng.random() ** 4,
+        "liveness": rng.random() * 0.6,
+        "valence": rng.random(),
+        "tempo": rng.uniform(60, 200),
+    }
+
+
+async def populate(
+    engine: AsyncEngine, n_songs: int, seed: int = 0, batch_size: int = 50_000
+) -> None:
+    """Create the schema and bulk insert a synthetic catalogue."""
+    df = synthetic_catalogue(n_songs, seed).astype(object)
+    df = df.where(pd.notnull(df), None)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for start in range(0, n_songs, batch_size):
+            records = df.iloc[start : start + batch_size].to_dict("records")
+            await conn.execute(insert(SongModel), records)
@@ -0,0 +1,229 @@
+"""Recommendation and catalogue benchmarks over synthetic catalogues.
+
+For every catalogue size a fresh SQLite database is populated with synthetic
+songs and the following scenarios are timed:
+
+- recommend: `RecommenderService.recommend` with random seed songs
+- recommend_from_features: `RecommenderService.recommend_from_features`
+- recommend_from_partial_features: the same with only energy, valence and
+  instrumentalness, as the agent returns for most prompts
+- search: `SongRepository.get_all` with a search term
+- list_pages: walking the whole catalogue with `SongRepository.get_page` cursors
+- index_build: building the recommendation index from the database
+- seeder: `seed_database` loading a CSV of the same size into an empty database
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.run --sizes 10000 100000 1000000
+    uv run python -m benchmarks.run --json results.json
+    uv run python -m benchmarks.run --baseline results.json --tolerance 0.25
+
+With --baseline the run fails when a scenario's p95 latency is more than
+`tolerance` slower than in the baseline file.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.repositories.feature_store import FeatureStore
+from src.repositories.song_repository import SongRepository
+from src.services.recommendation_index import RecommendationIndex
+from src.services.recommender_service import RecommenderService
+from src.utils.seeder import seed_database
+
+from benchmarks.catalogue import populate, random_features, synthetic_catalogue
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(scenario: str, n_songs: int, timings: list[float]) -> dict:
+    timings_ms = [t * 1000 for t in timings]
+    percentiles = (
+        statistics.quantiles(timings_ms, n=100, method="inclusive")
+        if len(timings_ms) > 1
+        else timings_ms * 99
+    )
+    return {
+        "scenario": scenario,
+        "songs": n_songs,
+        "runs": len(timings),
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+        "throughput_per_s": len(timings) / sum(timings),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def measure(
+    call: Callable[[], Awaitable[object]], requests: int, warmup: int = 5
+) -> list[float]:
+    for _ in range(min(warmup, requests)):
+        await call()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_catalogue(n_songs: int, requests: int, workdir: str) -> list[dict]:
+    results = []
+    rng = np.random.default_rng(0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{workdir}/catalogue.db")
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    await populate(engine, n_songs)
+
+    async with session_factory() as session:
+        repo = SongRepository(session)
+        index = RecommendationIndex(FeatureStore(os.path.join(workdir, "features")))
+
+        start = time.perf_counter()
+        await index.build(repo)
+        results.append(
+            summarize("index_build", n_songs, [time.perf_counter() - start])
+        )
+
+        service = RecommenderService(repo, index)
+        seed_rows = rng.integers(0, n_songs, (requests + 5, 5))
+        seeds = iter([[f"track_{i}" for i in row] for row in seed_rows])
+        timings = await measure(lambda: service.recommend(next(seeds), 10), requests)
+        results.append(summarize("recommend", n_songs, timings))
+
+        features = iter([random_features(rng) for _ in range(requests + 5)])
+        timings = await measure(
+            lambda: service.recommend_from_features(next(features), 10), requests
+        )
+        results.append(summarize("recommend_from_features", n_songs, timings))
+
+        partial = ("energy", "valence", "instrumentalness")
+        features = iter(
+            [
+                {f: v for f, v in random_features(rng).items() if f in partial}
+                for _ in range(requests + 5)
+            ]
+        )
+        timings = await measure(
+            lambda: service.recommend_from_features(next(features), 10), requests
+        )
+        results.append(
+            summarize("recommend_from_partial_features", n_songs, timings)
+        )
+
+        n_artists = max(1, n_songs // 20)
+        timings = await measure(
+            lambda: repo.get_all(
+                limit=20, search=f"Artist {rng.integers(0, n_artists)}"
+            ),
+            requests,
+        )
+        results.append(summarize("search", n_songs, timings))
+
+        timings = []
+        cursor = None
+        while True:
+            start = time.perf_counter()
+            _, cursor = await repo.get_page(limit=1000, cursor=cursor)
+            timings.append(time.perf_counter() - start)
+            if cursor is None:
+                break
+        results.append(summarize("list_pages", n_songs, timings))
+    await engine.dispose()
+
+    # Seeder: load the same catalogue from CSV into an empty database
+    csv_path = os.path.join(workdir, "catalogue.csv")
+    synthetic_catalogue(n_songs).to_csv(csv_path, index=False)
+    seed_engine = create_async_engine(f"sqlite+aiosqlite:///{workdir}/seeded.db")
+    await populate(seed_engine, 0)
+    seed_sessions = async_sessionmaker(
+        seed_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await seed_database(csv_path, seed_sessions)
+    elapsed = time.perf_counter() - start
+    seeder = summarize("seeder", n_songs, [elapsed])
+    seeder["throughput_per_s"] = n_songs / elapsed  # rows per second
+    results.append(seeder)
+    await seed_engine.dispose()
+    return results
+
+
+def print_results(results: list[dict]) -> None:
+    header = (
+        f"{'scenario':<31} {'songs':>9} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9}"
+        f" {'p99 ms':>9} {'per s':>10} {'peak RSS MB':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<31} {r['songs']:>9} {r['runs']:>5}"
+            f" {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+            f" {r['throughput_per_s']:>10.1f} {r['peak_rss_mb']:>12.1f}"
+        )
+
+
+def regressions(results: list[dict], baseline: list[dict], tolerance: float):
+    previous = {(r["scenario"], r["songs"]): r for r in baseline}
+    for r in results:
+        before = previous.get((r["scenario"], r["songs"]))
+        if before and r["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            yield r, before
+
+
+async def main(args: argparse.Namespace) -> int:
+    results = []
+    for n_songs in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            results.extend(await bench_catalogue(n_songs, args.requests, workdir))
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failed = list(regressions(results, baseline, args.tolerance))
+        for r, before in failed:
+            print(
+                f"REGRESSION {r['scenario']} ({r['songs']} songs): p95"
+                f" {before['p95_ms']:.2f} ms -> {r['p95_ms']:.2f} ms"
+            )
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[1:]),
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    sys.exit(asyncio.run(main(parser.parse_args())))
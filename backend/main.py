@@ -1,18 +1,53 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import logfire
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from src.api.routes import music, recommendations, songs
+from src.agents.song_feature_agent import song_features_agents
+from src.api.dependencies import create_music_service
+from src.api.routes import health, music, recommendations, songs
 from src.core.config import settings
-from src.utils.seeder import seed_database
+from src.core.database import AsyncSessionLocal
+from src.core.http_clients import http_clients
+from src.services.audio_prefetch import audio_prefetcher
+from src.services.recommendation_index import recommendation_index
+from src.services.recommender_service import recommender_pool
+from src.services.warmup import warmup
+from src.utils.concurrency import PoolSaturated
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await seed_database()
+    http_clients.open()
+    await song_features_agents.open()
+    # Seed and build the index in the background so the app accepts
+    # connections right away; /health/ready reports the progress.
+    warmup.start()
+    warmup_task = asyncio.create_task(
+        warmup.run(recommendation_index, AsyncSessionLocal)
+    )
+    compaction_task = asyncio.create_task(
+        recommendation_index.run_compaction_loop(
+            settings.RECOMMENDER_COMPACTION_INTERVAL_SECONDS
+        )
+    )
+    refresh_task = asyncio.create_task(
+        recommendation_index.run_refresh_loop(settings.SHARED_INDEX_POLL_SECONDS)
+    )
+    prefetch_task = asyncio.create_task(
+        audio_prefetcher.run(AsyncSessionLocal, create_music_service)
+    )
     yield
+    warmup_task.cancel()
+    compaction_task.cancel()
+    refresh_task.cancel()
+    prefetch_task.cancel()
+    await http_clients.close()
+    await song_features_agents.close()
+    recommender_pool.shutdown()
 
 
 def configure_logfire():
@@ -39,8 +74,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    # Shed load rather than queueing without bound
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
+
+
+app.include_router(health.router)
 app.include_router(songs.router, prefix=settings.API_V1_STR)
 app.include_router(recommendations.router, prefix=settings.API_V1_STR)
 app.include_router(music.router, prefix=settings.API_V1_STR)
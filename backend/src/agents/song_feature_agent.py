@@ -1,6 +1,10 @@
+import asyncio
+from contextlib import AsyncExitStack
+
 from pydantic_ai import Agent, AgentRunResult
 from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.providers.google import GoogleProvider
+from pydantic_ai.settings import ModelSettings
 
 from src.agents.prompts import system_prompt
 from src.core.config import settings
@@ -8,18 +12,59 @@ from src.domain.schemas.song import SongFeatures
 
 
 class SongFeaturesAgent:
-    def __init__(self):
-        provider = GoogleProvider(api_key=settings.GOOGLE_API_KEY)
-        model = GoogleModel(settings.MODEL, provider=provider)
+    def __init__(self, base_url: str | None = None):
+        # The provider owns a pooled HTTP client, so one agent is meant to be
+        # shared by every request (see `song_features_agents`)
+        provider = GoogleProvider(api_key=settings.GOOGLE_API_KEY, base_url=base_url)
+        model = GoogleModel(
+            settings.MODEL,
+            provider=provider,
+            settings=ModelSettings(timeout=settings.LLM_TIMEOUT_SECONDS),
+        )
         self.agent = Agent(
             system_prompt=system_prompt,
             model=model,
             output_type=SongFeatures,
         )
+        self._semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENT_REQUESTS)
 
     async def __call__(
         self,
         input: str,
     ) -> AgentRunResult[SongFeatures]:
-        answer: SongFeatures = await self.agent.run(input)
+        async with self._semaphore:
+            answer: SongFeatures = await self.agent.run(input)
         return answer.output
+
+
+class SongFeaturesAgents:
+    """The app-lifetime `SongFeaturesAgent`.
+
+    Opened in the lifespan and closed on shutdown, which also closes the
+    provider's HTTP client; an agent used before `open` (scripts, tests) is
+    created on first access.
+    """
+
+    def __init__(self):
+        self._agent: SongFeaturesAgent | None = None
+        self._stack = AsyncExitStack()
+
+    @property
+    def agent(self) -> SongFeaturesAgent:
+        if self._agent is None:
+            self._agent = SongFeaturesAgent()
+        return self._agent
+
+    async def open(self) -> None:
+        try:
+            await self._stack.enter_async_context(self.agent.agent)
+        except Exception as e:
+            # E.g. no GOOGLE_API_KEY: only /recommend/text is unavailable
+            print(f"Error creating the song features agent: {e}")
+
+    async def close(self) -> None:
+        await self._stack.aclose()
+        self._agent = None
+
+
+song_features_agents = SongFeaturesAgents()
@@ -1,15 +1,30 @@
-from fastapi import Depends
+import httpx
+from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.agents.song_feature_agent import SongFeaturesAgent
+from src.agents.song_feature_agent import SongFeaturesAgent, song_features_agents
 from src.core.database import get_db_session
+from src.core.http_clients import deezer_rate_limit, http_clients
 from src.repositories.deezer_repository import DeezerRepository
+from src.repositories.prompt_features_repository import PromptFeaturesRepository
 from src.repositories.song_repository import SongRepository
 from src.repositories.spotify_repository import SpotifyRepository
+from src.repositories.track_audio_repository import TrackAudioRepository
+from src.services.audio_cache import AudioCache, audio_cache
+from src.services.audio_prefetch import AudioPrefetcher, audio_prefetcher
 from src.services.music_service import MusicService
-from src.services.recommender_service import RecommenderService
+from src.services.prompt_cache import PromptCache, prompt_cache
+from src.services.recommendation_cache import RecommendationCache, recommendation_cache
+from src.services.recommendation_index import (
+    RecommendationIndex,
+    recommendation_index,
+)
+from src.services.recommender_service import RecommenderService, recommender_pool
 from src.services.song_service import SongService
+from src.services.spotify_token import SpotifyTokenManager, spotify_token_manager
 from src.services.text_structure import TextStructureService
+from src.services.warmup import Warmup, warmup
+from src.utils.concurrency import ComputePool
 
 
 async def get_repository(
@@ -18,40 +33,140 @@ async def get_repository(
     return SongRepository(session)
 
 
+async def get_recommendation_index() -> RecommendationIndex:
+    return recommendation_index
+
+
+async def get_warmup() -> Warmup:
+    return warmup
+
+
+async def require_warm_index(
+    warmup: Warmup = Depends(get_warmup),
+) -> None:
+    """Answer 503 "warming" while the startup seeding and index build run."""
+    if warmup.in_progress:
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "warming", **warmup.status()},
+            headers={"Retry-After": "5"},
+        )
+
+
 async def get_song_service(
     repo: SongRepository = Depends(get_repository),
+    index: RecommendationIndex = Depends(get_recommendation_index),
 ) -> SongService:
-    return SongService(repo)
+    return SongService(repo, index)
+
+
+async def get_recommendation_cache() -> RecommendationCache:
+    return recommendation_cache
+
+
+async def get_recommender_pool() -> ComputePool:
+    return recommender_pool
 
 
 async def get_recommender_service(
     repo: SongRepository = Depends(get_repository),
+    index: RecommendationIndex = Depends(get_recommendation_index),
+    cache: RecommendationCache = Depends(get_recommendation_cache),
+    pool: ComputePool = Depends(get_recommender_pool),
 ) -> RecommenderService:
-    return RecommenderService(repo)
+    return RecommenderService(repo, index, cache, pool)
+
+
+async def get_spotify_http_client() -> httpx.AsyncClient:
+    return http_clients.spotify
+
+
+async def get_deezer_http_client() -> httpx.AsyncClient:
+    return http_clients.deezer
+
 
+async def get_spotify_repository(
+    client: httpx.AsyncClient = Depends(get_spotify_http_client),
+) -> SpotifyRepository:
+    return SpotifyRepository(client)
 
-async def get_spotify_repository() -> SpotifyRepository:
-    return SpotifyRepository()
 
+async def get_deezer_repository(
+    client: httpx.AsyncClient = Depends(get_deezer_http_client),
+) -> DeezerRepository:
+    return DeezerRepository(client, deezer_rate_limit)
 
-async def get_deezer_repository() -> DeezerRepository:
-    return DeezerRepository()
+
+async def get_spotify_token_manager() -> SpotifyTokenManager:
+    return spotify_token_manager
+
+
+async def get_track_audio_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> TrackAudioRepository:
+    return TrackAudioRepository(session)
+
+
+async def get_audio_cache() -> AudioCache:
+    return audio_cache
 
 
 async def get_music_service(
     song_repo: SongRepository = Depends(get_repository),
     deezer_repo: DeezerRepository = Depends(get_deezer_repository),
     spotify_repo: SpotifyRepository = Depends(get_spotify_repository),
+    spotify_tokens: SpotifyTokenManager = Depends(get_spotify_token_manager),
+    track_audio_repo: TrackAudioRepository = Depends(get_track_audio_repository),
+    audio_cache: AudioCache = Depends(get_audio_cache),
 ) -> MusicService:
-    return MusicService(song_repo, deezer_repo, spotify_repo)
+    return MusicService(
+        song_repo,
+        deezer_repo,
+        spotify_repo,
+        spotify_tokens,
+        track_audio_repo,
+        audio_cache,
+    )
+
+
+def create_music_service(session: AsyncSession) -> MusicService:
+    """A MusicService outside of a request, e.g. for the audio prefetcher."""
+    return MusicService(
+        SongRepository(session),
+        DeezerRepository(http_clients.deezer, deezer_rate_limit),
+        SpotifyRepository(http_clients.spotify),
+        spotify_token_manager,
+        TrackAudioRepository(session),
+        audio_cache,
+    )
+
+
+async def get_audio_prefetcher() -> AudioPrefetcher:
+    return audio_prefetcher
 
 
 async def get_song_feature_agent() -> SongFeaturesAgent:
-    return SongFeaturesAgent()
+    return song_features_agents.agent
+
+
+async def get_prompt_features_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> PromptFeaturesRepository:
+    return PromptFeaturesRepository(session)
+
+
+async def get_prompt_cache() -> PromptCache:
+    return prompt_cache
 
 
 async def get_text_structure_service(
     agent: SongFeaturesAgent = Depends(get_song_feature_agent),
     recommender_service: RecommenderService = Depends(get_recommender_service),
+    prompt_features_repo: PromptFeaturesRepository = Depends(
+        get_prompt_features_repository
+    ),
+    prompt_cache: PromptCache = Depends(get_prompt_cache),
 ) -> TextStructureService:
-    return TextStructureService(agent, recommender_service)
+    return TextStructureService(
+        agent, recommender_service, prompt_features_repo, prompt_cache
+    )
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from src.api.dependencies import (
+    get_audio_cache,
+    get_audio_prefetcher,
+    get_prompt_cache,
+    get_recommendation_cache,
+    get_recommendation_index,
+    get_recommender_pool,
+    get_warmup,
+)
+from src.services.audio_cache import AudioCache
+from src.services.audio_prefetch import AudioPrefetcher
+from src.services.prompt_cache import PromptCache
+from src.services.recommendation_cache import RecommendationCache
+from src.services.recommendation_index import RecommendationIndex
+from src.services.warmup import Warmup
+from src.utils.concurrency import ComputePool
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(
+    warmup: Warmup = Depends(get_warmup),
+    index: RecommendationIndex = Depends(get_recommendation_index),
+):
+    is_ready = index.is_ready and not warmup.in_progress
+    if is_ready:
+        status = "ready"
+    else:
+        status = "failed" if warmup.phase == "failed" else "warming"
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": status,
+            "indexed_songs": index.size,
+            "index_generation": index.generation,
+            **warmup.status(),
+        },
+    )
+
+
+@router.get("/audio-cache")
+async def audio_cache_stats(
+    audio_cache: AudioCache = Depends(get_audio_cache),
+    prefetcher: AudioPrefetcher = Depends(get_audio_prefetcher),
+):
+    return {"cache": audio_cache.stats(), "prefetch": prefetcher.stats()}
+
+
+@router.get("/prompt-cache")
+async def prompt_cache_stats(prompt_cache: PromptCache = Depends(get_prompt_cache)):
+    return prompt_cache.stats()
+
+
+@router.get("/recommendation-cache")
+async def recommendation_cache_stats(
+    cache: RecommendationCache = Depends(get_recommendation_cache),
+):
+    return cache.stats()
+
+
+@router.get("/recommender-pool")
+async def recommender_pool_stats(pool: ComputePool = Depends(get_recommender_pool)):
+    return pool.stats()
@@ -1,10 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
 from src.api.dependencies import get_music_service
+from src.core.config import settings
 from src.services.music_service import MusicService
 
+
+class AudioBatchRequest(BaseModel):
+    track_ids: list[str]
+
+
 router = APIRouter(prefix="/music", tags=["music"])
 
 
+@router.post("/audio/batch")
+async def get_songs_audio(
+    request: AudioBatchRequest, service: MusicService = Depends(get_music_service)
+):
+    if len(request.track_ids) > settings.AUDIO_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.AUDIO_BATCH_MAX_SIZE} track ids per batch",
+        )
+    results = await service.get_songs_audio(request.track_ids)
+    # Tracks that could not be resolved do not fail the others
+    return {
+        "results": {
+            track_id: result
+            for track_id, result in results.items()
+            if "error" not in result
+        },
+        "errors": {
+            track_id: result["error"]
+            for track_id, result in results.items()
+            if "error" in result
+        },
+    }
+
+
 @router.get("/audio/{track_id}")
 async def get_song_audio(
     track_id: str, service: MusicService = Depends(get_music_service)
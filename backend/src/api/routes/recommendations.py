@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from src.api.dependencies import get_recommender_service, get_text_structure_service
+from src.api.dependencies import (
+    get_audio_prefetcher,
+    get_recommender_service,
+    get_text_structure_service,
+    require_warm_index,
+)
+from src.core.config import settings
 from src.domain.schemas.song import SongResponse
+from src.services.audio_prefetch import AudioPrefetcher
 from src.services.recommender_service import RecommenderService
 from src.services.text_structure import TextStructureService
 
@@ -17,20 +24,54 @@ class TextRecommendationRequest(BaseModel):
     limit: int = 10
 
 
-router = APIRouter(prefix="/recommend", tags=["recommendations"])
+router = APIRouter(
+    prefix="/recommend",
+    tags=["recommendations"],
+    dependencies=[Depends(require_warm_index)],
+)
 
 
 @router.post("/", response_model=list[SongResponse])
 async def recommend_songs(
     request: RecommendationRequest,
+    prefetch_audio: bool = False,
     service: RecommenderService = Depends(get_recommender_service),
+    prefetcher: AudioPrefetcher = Depends(get_audio_prefetcher),
 ):
-    return await service.recommend(request.song_ids, request.limit)
+    songs = await service.recommend(request.song_ids, request.limit)
+    if prefetch_audio:
+        prefetcher.enqueue([song.track_id for song in songs])
+    return songs
+
+
+@router.post("/batch", response_model=list[list[SongResponse]])
+async def recommend_songs_batch(
+    requests: list[RecommendationRequest],
+    prefetch_audio: bool = False,
+    service: RecommenderService = Depends(get_recommender_service),
+    prefetcher: AudioPrefetcher = Depends(get_audio_prefetcher),
+):
+    if len(requests) > settings.RECOMMENDER_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RECOMMENDER_MAX_BATCH_SIZE} requests per batch",
+        )
+    results = await service.recommend_batch(
+        [(request.song_ids, request.limit) for request in requests]
+    )
+    if prefetch_audio:
+        prefetcher.enqueue([song.track_id for songs in results for song in songs])
+    return results
 
 
 @router.post("/text", response_model=list[SongResponse])
 async def recommend_by_text(
     request: TextRecommendationRequest,
+    prefetch_audio: bool = False,
     service: TextStructureService = Depends(get_text_structure_service),
+    prefetcher: AudioPrefetcher = Depends(get_audio_prefetcher),
 ):
-    return await service.text_structure(request.text_input, request.limit)
+    songs = await service.text_structure(request.text_input, request.limit)
+    if prefetch_audio:
+        prefetcher.enqueue([song.track_id for song in songs])
+    return songs
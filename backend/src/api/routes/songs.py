@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from src.api.dependencies import get_song_service
 from src.domain.schemas.song import SongCreate, SongResponse, SongUpdate
 from src.services.song_service import SongService
@@ -15,12 +18,47 @@ async def create_song(
 
 @router.get("/", response_model=list[SongResponse])
 async def read_songs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     search: str | None = None,
+    cursor: str | None = None,
+    service: SongService = Depends(get_song_service),
+):
+    # The next page is requested by passing the X-Next-Cursor header back
+    # as `cursor`, which stays fast however deep the page is.
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor")
+    try:
+        songs, next_cursor = await service.get_songs_page(
+            limit=limit, offset=skip, search=search, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return songs
+
+
+@router.get("/export")
+async def export_songs(
+    format: Literal["ndjson", "csv", "arrow"] = "ndjson",
+    validate: bool = False,
     service: SongService = Depends(get_song_service),
 ):
-    return await service.get_songs(limit=limit, offset=skip, search=search)
+    """Stream the whole catalogue as NDJSON, CSV or an Arrow IPC stream."""
+    try:
+        media_type, chunks = service.export_songs(format, validate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    extension = "arrows" if format == "arrow" else format
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="songs.{extension}"'
+        },
+    )
 
 
 @router.get("/{track_id}", response_model=SongResponse)
@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,18 +7,105 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Music Recommender"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite+aiosqlite:///./src/core/storage/music.db"
+    # Song search: "fulltext" (ranked word-prefix matching) or "substring"
+    SEARCH_MODE: str = "fulltext"
+    # Rows fetched from the database per chunk of GET /songs/export
+    EXPORT_BATCH_SIZE: int = 1000
 
     # Spotify API Configuration
     URL_SPOTIFY: str = "https://api.spotify.com/v1"
     URL_SPOTIFY_ACCOUNT: str = "https://accounts.spotify.com/api/token"
     SPOTIFY_BASIC_AUTHENTICATION: str = ""
+    # Access tokens are refreshed in the background this long before expiry
+    SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS: float = 60.0
+
+    # Cache of the Deezer metadata served by GET /music/audio/{track_id}:
+    # in-process LRU entries, then a `track_audio` table. Lookups older than
+    # AUDIO_CACHE_TTL_SECONDS are still served for AUDIO_CACHE_STALE_SECONDS
+    # more while they are refreshed in the background.
+    AUDIO_CACHE_SIZE: int = 10_000
+    AUDIO_CACHE_TTL_SECONDS: float = 86_400.0
+    AUDIO_CACHE_STALE_SECONDS: float = 604_800.0
+    # How long "not found on Deezer" is remembered
+    AUDIO_CACHE_NEGATIVE_TTL_SECONDS: float = 3_600.0
 
     # Deezer API Configuration
     URL_DEEZER: str = "https://api.deezer.com"
+    # Deezer allows 50 requests per 5 seconds: a sustained rate plus a burst
+    # that together stay within that window
+    DEEZER_RATE_LIMIT_PER_SECOND: float = 8.0
+    DEEZER_RATE_LIMIT_BURST: int = 10
+    # POST /music/audio/batch: ids per request, Deezer lookups run at once
+    AUDIO_BATCH_MAX_SIZE: int = 50
+    AUDIO_BATCH_CONCURRENCY: int = 8
+    # Background warming of the audio cache for recommended tracks
+    # (?prefetch_audio=true on the /recommend routes)
+    AUDIO_PREFETCH_QUEUE_SIZE: int = 1000
+    AUDIO_PREFETCH_BATCH_SIZE: int = 10
+
+    # Outgoing HTTP clients (one pooled client per upstream API, shared by
+    # every request for the lifetime of the app)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 10.0
+    # How long a request waits for a free connection from the pool
+    HTTP_POOL_TIMEOUT_SECONDS: float = 5.0
+    # Negotiated with servers that support it, when the h2 package is installed
+    HTTP2: bool = True
 
     # LLM Configuration
     MODEL: str = "gemini-2.5-flash-lite-preview-09-2025"
     GOOGLE_API_KEY: str = ""
+    # The agent is shared by every request: calls made to the model at once
+    # (others wait their turn) and the timeout of each call
+    LLM_MAX_CONCURRENT_REQUESTS: int = 16
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    # Cache of the features extracted from /recommend/text prompts (in
+    # memory, then a `prompt_features` table). Prompts are matched after
+    # normalization, or by character trigram similarity at or above
+    # PROMPT_CACHE_SIMILARITY (0 matches normalized prompts only; trigrams
+    # do not tell "with vocals" from "without vocals").
+    PROMPT_CACHE_SIZE: int = 5_000
+    PROMPT_CACHE_TTL_SECONDS: float = 2_592_000.0
+    PROMPT_CACHE_SIMILARITY: float = 0.0
+
+    # Recommendation index
+    # Directory of the memory-mapped feature store ("" keeps it in memory only);
+    # it shares the raw feature rows only, see SHARED_INDEX_DIR for the rest
+    FEATURE_STORE_DIR: str = "./src/core/storage/features"
+    # Directory where the first worker publishes the fitted index for every
+    # uvicorn worker to map read-only ("" fits one copy per worker), and how
+    # often workers check for a newer generation
+    SHARED_INDEX_DIR: str = ""
+    SHARED_INDEX_POLL_SECONDS: float = 5.0
+    # When no generation there matches the catalogue at startup: "rebuild"
+    # (fit and publish one) or "refuse" (fail the warm-up; publish one with
+    # `python -m src.utils.index_builder` first)
+    SHARED_INDEX_ON_MISMATCH: str = "rebuild"
+    # Neighbour search: "ball_tree", "kd_tree", "brute" (exact), "ivf"
+    # (approximate) or "auto" (ivf from RECOMMENDER_ANN_MIN_SONGS songs)
+    RECOMMENDER_BACKEND: str = "auto"
+    RECOMMENDER_ANN_MIN_SONGS: int = 500_000
+    # IVF cells (0 = sqrt of the catalogue size) and cells scanned per query;
+    # more probes means better recall and slower queries
+    RECOMMENDER_IVF_LISTS: int = 0
+    RECOMMENDER_IVF_PROBES: int = 8
+    RECOMMENDER_MAX_BATCH_SIZE: int = 1000
+    # Threads running kNN queries off the event loop, and how many more
+    # queries may wait for one before requests get a 503. More workers than
+    # cores only take GIL time away from the event loop.
+    RECOMMENDER_POOL_WORKERS: int = min(4, os.cpu_count() or 1)
+    RECOMMENDER_POOL_MAX_QUEUED: int = 64
+    RECOMMENDER_COMPACTION_THRESHOLD: int = 1000
+    RECOMMENDER_COMPACTION_INTERVAL_SECONDS: float = 300.0
+    # Recommended track ids per query (sorted seed ids and limit, or the
+    # scaled feature vector rounded to RECOMMENDATION_CACHE_QUANTUM), dropped
+    # whenever the index changes
+    RECOMMENDATION_CACHE_SIZE: int = 10_000
+    RECOMMENDATION_CACHE_TTL_SECONDS: float = 600.0
+    RECOMMENDATION_CACHE_QUANTUM: float = 0.001
 
     LOGFIRE: bool = False
 
@@ -0,0 +1,70 @@
+import importlib.util
+
+import httpx
+
+from src.core.config import settings
+from src.utils.rate_limit import TokenBucket
+
+
+def create_http_client(base_url: str, **kwargs) -> httpx.AsyncClient:
+    """A pooled client with keep-alive, the configured limits and timeouts.
+
+    Extra keyword arguments are passed on to `httpx.AsyncClient`.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=settings.HTTP2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.HTTP_POOL_TIMEOUT_SECONDS,
+        ),
+        **kwargs,
+    )
+
+
+class HTTPClients:
+    """The app-lifetime HTTP clients of the external music APIs.
+
+    Opened in the lifespan and closed on shutdown; a client used before
+    `open` (scripts, tests) is created on first access.
+    """
+
+    def __init__(self):
+        self._deezer: httpx.AsyncClient | None = None
+        self._spotify: httpx.AsyncClient | None = None
+
+    @property
+    def deezer(self) -> httpx.AsyncClient:
+        if self._deezer is None or self._deezer.is_closed:
+            self._deezer = create_http_client(settings.URL_DEEZER)
+        return self._deezer
+
+    @property
+    def spotify(self) -> httpx.AsyncClient:
+        if self._spotify is None or self._spotify.is_closed:
+            self._spotify = create_http_client(settings.URL_SPOTIFY)
+        return self._spotify
+
+    def open(self) -> None:
+        self._deezer = create_http_client(settings.URL_DEEZER)
+        self._spotify = create_http_client(settings.URL_SPOTIFY)
+
+    async def close(self) -> None:
+        for client in (self._deezer, self._spotify):
+            if client is not None:
+                await client.aclose()
+        self._deezer = self._spotify = None
+
+
+http_clients = HTTPClients()
+
+# Shared by every request so the quota holds across the whole app
+deezer_rate_limit = TokenBucket(
+    settings.DEEZER_RATE_LIMIT_PER_SECOND, settings.DEEZER_RATE_LIMIT_BURST
+)
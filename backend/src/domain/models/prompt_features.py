@@ -0,0 +1,21 @@
+from sqlalchemy import JSON, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.domain.models.song import Base
+
+
+class PromptFeaturesModel(Base):
+    """Song features the LLM agent extracted from a text prompt.
+
+    Keyed by the normalized prompt and the model that answered it, so
+    switching `MODEL` does not serve another model's answers.
+    """
+
+    __tablename__ = "prompt_features"
+
+    prompt: Mapped[str] = mapped_column(String, primary_key=True)
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    # `SongFeatures` as a JSON object
+    features: Mapped[dict] = mapped_column(JSON)
+    # Unix time of the agent call
+    created_at: Mapped[float] = mapped_column(Float)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Float, Integer
+from sqlalchemy import DDL, Float, Integer, String, event
 
 class Base(DeclarativeBase):
     pass
@@ -31,3 +31,56 @@ class SongModel(Base):
     valence: Mapped[float] = mapped_column(Float)
     tempo: Mapped[float] = mapped_column(Float)
     duration_ms: Mapped[int] = mapped_column(Integer)
+
+
+# Full-text search over track name and artist. SQLite keeps an FTS5 table in
+# sync with triggers; the FTS row of a song is found through its (indexed)
+# track_id column, since the rowid of `songs` is not stable across VACUUM.
+# PostgreSQL uses a GIN index over the same tsvector expression the
+# repository queries.
+_SQLITE_FTS_MATCH_OLD = (
+    "SELECT rowid FROM songs_fts WHERE songs_fts MATCH "
+    "'track_id:\"' || replace(old.track_id, '\"', '\"\"') || '\"' "
+    "AND track_id = old.track_id"
+)
+# Dropped during bulk loads, which index the new rows in one statement instead
+SONG_SEARCH_SQLITE_INSERT_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS songs_fts_insert AFTER INSERT ON songs BEGIN "
+    "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+    "VALUES (new.track_id, new.track_name, new.track_artist); END"
+)
+SONG_SEARCH_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5("
+    "track_id, track_name, track_artist, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    SONG_SEARCH_SQLITE_INSERT_TRIGGER,
+    "CREATE TRIGGER IF NOT EXISTS songs_fts_delete AFTER DELETE ON songs BEGIN "
+    f"DELETE FROM songs_fts WHERE rowid IN ({_SQLITE_FTS_MATCH_OLD}); END",
+    "CREATE TRIGGER IF NOT EXISTS songs_fts_update "
+    "AFTER UPDATE OF track_id, track_name, track_artist ON songs BEGIN "
+    f"DELETE FROM songs_fts WHERE rowid IN ({_SQLITE_FTS_MATCH_OLD}); "
+    "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+    "VALUES (new.track_id, new.track_name, new.track_artist); END",
+]
+SONG_SEARCH_POSTGRESQL_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_songs_search ON songs USING gin "
+    "(to_tsvector('simple', track_name || ' ' || track_artist))",
+]
+
+for _statement in SONG_SEARCH_SQLITE_DDL:
+    event.listen(
+        SongModel.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+for _statement in SONG_SEARCH_POSTGRESQL_DDL:
+    event.listen(
+        SongModel.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    SongModel.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS songs_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Boolean, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.domain.models.song import Base
+
+
+class TrackAudioModel(Base):
+    """Deezer metadata of a song, cached by `MusicService.get_song_audio`.
+
+    `found` is False for songs Deezer has no match for (negative cache).
+    """
+
+    __tablename__ = "track_audio"
+
+    track_id: Mapped[str] = mapped_column(String, primary_key=True)
+    found: Mapped[bool] = mapped_column(Boolean)
+    deezer_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    preview_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    external_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    album_image: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Unix time of the Deezer lookup
+    fetched_at: Mapped[float] = mapped_column(Float)
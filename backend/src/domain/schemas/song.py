@@ -2,72 +2,71 @@ from pydantic import BaseModel, ConfigDict, Field
 
 
 class SongFeatures(BaseModel):
-    danceability: float = Field(
-        description="Danceability describes how suitable a track is for dancing based on a combination of musical elements including tempo, rhythm stability, beat strength, and overall regularity. A value of 0.0 is least danceable and 1.0 is most danceable."
-    )
+    """Audio features of a song, or the ones a text prompt asks for.
 
-    energy: float = Field(
-        description="Energy is a measure from 0.0 to 1.0 and represents a perceptual measure of intensity and activity. Typically, energetic tracks feel fast, loud, and noisy. For example, death metal has high energy, while a Bach prelude scores low on the scale."
-    )
+    The agent leaves out the features a prompt does not imply, so every
+    field is optional here; stored songs (`SongBase`) have all of them.
+    """
 
-    key: int = Field(
-        description="The key the track is in. Integers map to pitches using standard Pitch Class notation. E.g. 0 = C, 1 = C♯/D♭, 2 = D, and so on."
+    danceability: float | None = Field(
+        default=None,
+        description="Danceability describes how suitable a track is for dancing based on a combination of musical elements including tempo, rhythm stability, beat strength, and overall regularity. A value of 0.0 is least danceable and 1.0 is most danceable.",
     )
 
-    loudness: float = Field(
-        description="The overall loudness of a track in decibels (dB). Loudness values are averaged across the entire track and are useful for comparing relative loudness of tracks. Values typical range between -60 and 0 db."
+    energy: float | None = Field(
+        default=None,
+        description="Energy is a measure from 0.0 to 1.0 and represents a perceptual measure of intensity and activity. Typically, energetic tracks feel fast, loud, and noisy. For example, death metal has high energy, while a Bach prelude scores low on the scale.",
     )
 
-    mode: int = Field(
-        description="Mode indicates the modality (major or minor) of a track, the type of scale from which its melodic content is derived. Major is represented by 1 and minor is 0."
+    key: int | None = Field(
+        default=None,
+        description="The key the track is in. Integers map to pitches using standard Pitch Class notation. E.g. 0 = C, 1 = C♯/D♭, 2 = D, and so on.",
     )
 
-    speechiness: float = Field(
-        description="Speechiness detects the presence of spoken words in a track."
+    loudness: float | None = Field(
+        default=None,
+        description="The overall loudness of a track in decibels (dB). Loudness values are averaged across the entire track and are useful for comparing relative loudness of tracks. Values typical range between -60 and 0 db.",
     )
 
-    acousticness: float = Field(
-        description="A confidence measure from 0.0 to 1.0 of whether the track is acoustic. 1.0 represents high confidence the track is acoustic."
+    mode: int | None = Field(
+        default=None,
+        description="Mode indicates the modality (major or minor) of a track, the type of scale from which its melodic content is derived. Major is represented by 1 and minor is 0.",
     )
 
-    instrumentalness: float = Field(
-        description="Predicts whether a track contains no vocals. 'Ooh' and 'aah' sounds are treated as instrumental in this context."
+    speechiness: float | None = Field(
+        default=None,
+        description="Speechiness detects the presence of spoken words in a track.",
     )
 
-    liveness: float = Field(
-        description="Detects the presence of an audience in the recording."
+    acousticness: float | None = Field(
+        default=None,
+        description="A confidence measure from 0.0 to 1.0 of whether the track is acoustic. 1.0 represents high confidence the track is acoustic.",
     )
 
-    valence: float = Field(
-        description="A measure from 0.0 to 1.0 describing the musical positiveness conveyed by a track."
+    instrumentalness: float | None = Field(
+        default=None,
+        description="Predicts whether a track contains no vocals. 'Ooh' and 'aah' sounds are treated as instrumental in this context.",
     )
 
-    mode: int = Field(
-        description="Mode indicates the modality (major or minor) of a track, the type of scale from which its melodic content is derived. Major is represented by 1 and minor is 0."
+    liveness: float | None = Field(
+        default=None,
+        description="Detects the presence of an audience in the recording.",
     )
 
-    speechiness: float = Field(
-        description="Speechiness detects the presence of spoken words in a track."
+    valence: float | None = Field(
+        default=None,
+        description="A measure from 0.0 to 1.0 describing the musical positiveness conveyed by a track.",
     )
 
-    acousticness: float = Field(
-        description="A confidence measure from 0.0 to 1.0 of whether the track is acoustic. 1.0 represents high confidence the track is acoustic."
+    tempo: float | None = Field(
+        default=None,
+        description="BPM. Low (<80) for relax, High (>120) for workout/energy.",
     )
 
-    instrumentalness: float = Field(
-        description="Predicts whether a track contains no vocals. 'Ooh' and 'aah' sounds are treated as instrumental in this context."
-    )
 
-    liveness: float = Field(
-        description="Detects the presence of an audience in the recording."
-    )
-
-    valence: float = Field(
-        description="A measure from 0.0 to 1.0 describing the musical positiveness conveyed by a track."
-    )
-    tempo: float = Field(
-        description="BPM. Low (<80) for relax, High (>120) for workout/energy."
-    )
+def _required_feature(name: str):
+    """The field of a `SongFeatures` feature, without its default."""
+    return Field(description=SongFeatures.model_fields[name].description)
 
 
 class SongBase(SongFeatures):
@@ -82,7 +81,18 @@ class SongBase(SongFeatures):
     playlist_genre: str | None = None
     playlist_subgenre: str | None = None
 
-    tempo: float
+    # Every feature is required for a stored song
+    danceability: float = _required_feature("danceability")
+    energy: float = _required_feature("energy")
+    key: int = _required_feature("key")
+    loudness: float = _required_feature("loudness")
+    mode: int = _required_feature("mode")
+    speechiness: float = _required_feature("speechiness")
+    acousticness: float = _required_feature("acousticness")
+    instrumentalness: float = _required_feature("instrumentalness")
+    liveness: float = _required_feature("liveness")
+    valence: float = _required_feature("valence")
+    tempo: float = _required_feature("tempo")
     duration_ms: int
 
 
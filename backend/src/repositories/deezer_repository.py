@@ -1,16 +1,20 @@
 import httpx
-from src.core.config import settings
+from src.utils.rate_limit import TokenBucket
 
 
 class DeezerRepository:
-    def __init__(self):
-        self.base_url = settings.URL_DEEZER
+    def __init__(
+        self, client: httpx.AsyncClient, rate_limit: TokenBucket | None = None
+    ):
+        # Pooled client with `URL_DEEZER` as base URL (see src/core/http_clients.py)
+        self.client = client
+        self.rate_limit = rate_limit
 
     async def search_song(self, name: str, artist: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            path = f"{self.base_url}/search"
-            query = f'track:"{name}" artist:"{artist}"'
-            params = {"q": query, "limit": 1}
-            response = await client.get(path, params=params)
-            response.raise_for_status()
-            return response.json()
+        query = f'track:"{name}" artist:"{artist}"'
+        params = {"q": query, "limit": 1}
+        if self.rate_limit is not None:
+            await self.rate_limit.acquire()
+        response = await self.client.get("/search", params=params)
+        response.raise_for_status()
+        return response.json()
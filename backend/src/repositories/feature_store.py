@@ -0,0 +1,111 @@
+import fcntl
+import os
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class FeatureStore:
+    """Columnar copy of the song audio features persisted as `.npy` files.
+
+    The features are kept as one contiguous float32 matrix with a parallel
+    array of track ids. Each write goes to a new snapshot directory holding
+    both files, and `CURRENT` names the newest one, so readers always map a
+    track id array and a feature matrix written together. Loading
+    memory-maps both files read-only, so every worker process shares the
+    same pages through the OS page cache.
+
+    Only the raw rows are shared: each worker still fits its own scaler,
+    scaled matrices, neighbour backend and track id index on top of them.
+    Sharing those as well is what `IndexStore` (`SHARED_INDEX_DIR`) is for.
+    """
+
+    _CURRENT_FILE = "CURRENT"
+    _LOCK_FILE = ".lock"
+    _FEATURES_FILE = "features.npy"
+    _TRACK_IDS_FILE = "track_ids.npy"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _snapshot_dir(self, snapshot: int) -> str:
+        return os.path.join(self.directory, "snapshots", str(snapshot))
+
+    @contextmanager
+    def _lock(self, operation: int) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, self._LOCK_FILE), "a") as f:
+            fcntl.flock(f, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def current_snapshot(self) -> int | None:
+        try:
+            with open(os.path.join(self.directory, self._CURRENT_FILE)) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self) -> tuple[np.ndarray, np.ndarray]:
+        """Map the current snapshot; raises ValueError when there is none."""
+        # Shared lock: a writer cannot prune the snapshot while it is opened
+        with self._lock(fcntl.LOCK_SH):
+            snapshot = self.current_snapshot()
+            if snapshot is None:
+                raise ValueError("Feature store is empty")
+            return self._load(snapshot)
+
+    def _load(self, snapshot: int) -> tuple[np.ndarray, np.ndarray]:
+        directory = self._snapshot_dir(snapshot)
+        track_ids = np.load(
+            os.path.join(directory, self._TRACK_IDS_FILE), mmap_mode="r"
+        )
+        features = np.load(
+            os.path.join(directory, self._FEATURES_FILE), mmap_mode="r"
+        )
+        if len(track_ids) != len(features):
+            raise ValueError("Feature store files are out of sync")
+        return track_ids, features
+
+    def write(
+        self, track_ids: np.ndarray, features: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Write both arrays as a new snapshot, make it current and map it.
+
+        The snapshot directory is written under a temporary name and renamed,
+        and `CURRENT` is replaced, so readers never see a partial snapshot.
+        Only the two newest snapshots are kept; workers still mapping an
+        older one keep their pages after it is deleted.
+        """
+        with self._lock(fcntl.LOCK_EX):
+            snapshot = (self.current_snapshot() or 0) + 1
+            target = self._snapshot_dir(snapshot)
+            tmp_dir = f"{target}.{os.getpid()}.tmp"
+            shutil.rmtree(target, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            features = np.ascontiguousarray(features, dtype=np.float32)
+            for name, array in (
+                (self._TRACK_IDS_FILE, np.asarray(track_ids, dtype=str)),
+                (self._FEATURES_FILE, features),
+            ):
+                with open(os.path.join(tmp_dir, name), "wb") as f:
+                    np.save(f, array)
+            os.rename(tmp_dir, target)
+
+            current_path = os.path.join(self.directory, self._CURRENT_FILE)
+            tmp_path = f"{current_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(str(snapshot))
+            os.replace(tmp_path, current_path)
+            self._prune(keep_from=snapshot - 1)
+            return self._load(snapshot)
+
+    def _prune(self, keep_from: int) -> None:
+        snapshots_dir = os.path.join(self.directory, "snapshots")
+        for name in os.listdir(snapshots_dir):
+            if name.isdigit() and int(name) < keep_from:
+                shutil.rmtree(os.path.join(snapshots_dir, name), ignore_errors=True)
@@ -0,0 +1,174 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import joblib  # type: ignore
+import numpy as np
+import sklearn  # type: ignore
+
+# Bumped whenever the layout of the bundle changes
+INDEX_FORMAT_VERSION = 2
+
+
+def catalogue_digest(track_ids: np.ndarray, raw_features: np.ndarray) -> str:
+    """SHA-256 of the track ids and float32 features the index is fitted on."""
+    digest = hashlib.sha256()
+    digest.update(np.asarray(track_ids, dtype=str).tobytes())
+    digest.update(np.ascontiguousarray(raw_features, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_digest(fingerprint: list) -> str:
+    """SHA-256 of `SongRepository.feature_fingerprint`."""
+    return hashlib.sha256(json.dumps(fingerprint).encode()).hexdigest()
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IndexStore:
+    """Generations of the fitted recommendation index, shared by worker processes.
+
+    Each generation is a directory holding one joblib bundle (the arrays and
+    the fitted scaler and neighbour backend) and its metadata, and `CURRENT`
+    names the newest one. Generations are written by the API workers and by
+    `python -m src.utils.index_builder`. The metadata records the bundle's
+    SHA-256, the bundle format and scikit-learn versions, and the catalogue
+    the index was fitted on. Loading memory-maps every array in the bundle
+    read-only, including the ones inside the fitted backend, so all workers
+    share the same pages through the OS page cache. Only the two newest
+    generations are kept; workers still mapping an older one keep their
+    pages after it is deleted.
+    """
+
+    _CURRENT_FILE = "CURRENT"
+    _LOCK_FILE = ".lock"
+    _BUNDLE_FILE = "index.joblib"
+    _META_FILE = "meta.json"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # (generation, bundle SHA-256) pairs whose checksum was verified
+        self._verified: set[tuple[int, str]] = set()
+
+    def _generation_dir(self, generation: int) -> str:
+        return os.path.join(self.directory, "generations", str(generation))
+
+    @contextmanager
+    def lock(self, shared: bool = False) -> Iterator[None]:
+        """Exclusive across processes; blocks, so hold it in a worker thread.
+
+        A shared lock is enough to read a generation: it keeps `publish`
+        from pruning it meanwhile.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, self._LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def current_generation(self) -> int | None:
+        try:
+            with open(os.path.join(self.directory, self._CURRENT_FILE)) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def metadata(self, generation: int) -> dict:
+        with open(os.path.join(self._generation_dir(generation), self._META_FILE)) as f:
+            return json.load(f)
+
+    def update_metadata(self, generation: int, **fields) -> None:
+        """Add fields to a generation's metadata. Call with the lock held."""
+        path = os.path.join(self._generation_dir(generation), self._META_FILE)
+        self._write_json(path, {**self.metadata(generation), **fields})
+
+    @staticmethod
+    def is_compatible(metadata: dict) -> bool:
+        # The fitted objects are pickles, only loadable by the same versions
+        return (
+            metadata.get("format_version") == INDEX_FORMAT_VERSION
+            and metadata.get("sklearn_version") == sklearn.__version__
+        )
+
+    def load(self, generation: int) -> dict:
+        """Map a generation, after checking its versions and checksum.
+
+        Call with the lock held. The checksum is only computed the first
+        time a generation is loaded. Raises ValueError when the generation
+        cannot be used.
+        """
+        metadata = self.metadata(generation)
+        if not self.is_compatible(metadata):
+            raise ValueError(
+                f"Index generation {generation} was written by format "
+                f"{metadata.get('format_version')} and scikit-learn "
+                f"{metadata.get('sklearn_version')}"
+            )
+        path = os.path.join(self._generation_dir(generation), self._BUNDLE_FILE)
+        checked = (generation, metadata.get("bundle_sha256"))
+        if checked not in self._verified:
+            if _file_sha256(path) != metadata.get("bundle_sha256"):
+                raise ValueError(f"Index generation {generation} fails its checksum")
+            self._verified.add(checked)
+        return joblib.load(path, mmap_mode="r")
+
+    @staticmethod
+    def _write_json(path: str, data: dict) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def publish(self, bundle: dict, metadata: dict) -> int:
+        """Write `bundle` as the next generation and make it current.
+
+        Call with the lock held. The generation directory is written under a
+        temporary name and renamed, and `CURRENT` is replaced, so readers
+        never see a partial generation.
+        """
+        generation = (self.current_generation() or 0) + 1
+        target = self._generation_dir(generation)
+        tmp_dir = f"{target}.{os.getpid()}.tmp"
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        bundle_path = os.path.join(tmp_dir, self._BUNDLE_FILE)
+        joblib.dump(bundle, bundle_path)
+        self._write_json(
+            os.path.join(tmp_dir, self._META_FILE),
+            {
+                **metadata,
+                "generation": generation,
+                "format_version": INDEX_FORMAT_VERSION,
+                "sklearn_version": sklearn.__version__,
+                "bundle_sha256": _file_sha256(bundle_path),
+                "created_at": time.time(),
+            },
+        )
+        os.rename(tmp_dir, target)
+
+        current_path = os.path.join(self.directory, self._CURRENT_FILE)
+        tmp_path = f"{current_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(generation))
+        os.replace(tmp_path, current_path)
+        self._prune(keep_from=generation - 1)
+        return generation
+
+    def _prune(self, keep_from: int) -> None:
+        generations_dir = os.path.join(self.directory, "generations")
+        for name in os.listdir(generations_dir):
+            if name.isdigit() and int(name) < keep_from:
+                shutil.rmtree(os.path.join(generations_dir, name), ignore_errors=True)
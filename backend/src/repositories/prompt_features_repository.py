@@ -0,0 +1,32 @@
+from collections.abc import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.prompt_features import PromptFeaturesModel
+
+
+class PromptFeaturesRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, prompt: str, model: str) -> PromptFeaturesModel | None:
+        return await self.session.get(PromptFeaturesModel, (prompt, model))
+
+    async def get_recent(
+        self, model: str, since: float, limit: int
+    ) -> Sequence[PromptFeaturesModel]:
+        stmt = (
+            select(PromptFeaturesModel)
+            .where(
+                PromptFeaturesModel.model == model,
+                PromptFeaturesModel.created_at >= since,
+            )
+            .order_by(PromptFeaturesModel.created_at.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def save(self, prompt_features: PromptFeaturesModel) -> None:
+        await self.session.merge(prompt_features)
+        await self.session.commit()
@@ -1,8 +1,53 @@
-from typing import Sequence
+import base64
+import binascii
+import json
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Row,
+    Select,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.domain.models.song import SongModel
+from src.core.config import settings
+from src.domain.models.song import SONG_SEARCH_SQLITE_INSERT_TRIGGER, SongModel
+
+# FTS5 table kept in sync with `songs` (see src/domain/models/song.py)
+_songs_fts = table("songs_fts", column("track_id"), column("rank"))
+_SEARCH_TERM = re.compile(r"\w+")
+# Units per 1.0 of the feature sums in `SongRepository.feature_fingerprint`
+FINGERPRINT_SCALE = 10**8
+
+
+def _encode_cursor(position: dict, search: str | None) -> str:
+    payload = json.dumps({**position, "search": search}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str, search: str | None) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(position, dict) or "id" not in position:
+        raise ValueError("Invalid cursor")
+    if position.get("search") != search:
+        raise ValueError("Cursor belongs to a different search")
+    return position
 
 
 class SongRepository:
@@ -18,16 +63,159 @@ class SongRepository:
     async def get_all(
         self, limit: int = 100, offset: int = 0, search: str | None = None
     ) -> Sequence[SongModel]:
-        stmt = select(SongModel)
-        if search:
-            search_pattern = f"%{search}%"
-            stmt = stmt.where(
-                (SongModel.track_name.ilike(search_pattern))
-                | (SongModel.track_artist.ilike(search_pattern))
+        songs, _ = await self.get_page(limit, offset=offset, search=search)
+        return songs
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        search: str | None = None,
+        cursor: str | None = None,
+    ) -> tuple[Sequence[SongModel], str | None]:
+        """One page of songs and the cursor of the next page (None at the end).
+
+        Songs are ordered by `track_id`, or by search rank then `track_id`, so
+        a page can be resumed from the key of the last row it returned: with
+        `cursor` the database seeks straight to the next page instead of
+        walking and discarding `offset` rows.
+        """
+        stmt, rank = self._search(select(SongModel), search)
+        sort_key = (rank, SongModel.track_id) if rank is not None else None
+        if sort_key is not None:
+            stmt = stmt.add_columns(rank.label("rank")).order_by(*sort_key)
+        else:
+            stmt = stmt.order_by(SongModel.track_id)
+
+        if cursor:
+            position = _decode_cursor(cursor, search)
+            if sort_key is not None:
+                if "rank" not in position:
+                    raise ValueError("Invalid cursor")
+                stmt = stmt.where(
+                    tuple_(*sort_key) > tuple_(position["rank"], position["id"])
+                )
+            else:
+                stmt = stmt.where(SongModel.track_id > position["id"])
+        elif offset:
+            stmt = stmt.offset(offset)
+
+        # One extra row tells whether there is a next page
+        result = await self.session.execute(stmt.limit(limit + 1))
+        rows = result.all()
+        if len(rows) <= limit or limit <= 0:
+            return [row[0] for row in rows[:limit]], None
+
+        rows = rows[:limit]
+        last = rows[-1]
+        position = {"id": last[0].track_id}
+        if sort_key is not None:
+            position["rank"] = last.rank
+        return [row[0] for row in rows], _encode_cursor(position, search)
+
+    def _search(
+        self, stmt: Select, search: str | None
+    ) -> tuple[Select, ColumnElement | None]:
+        """Filter `stmt` by song name or artist.
+
+        The full-text mode matches every word of `search` as a prefix and
+        also returns a rank expression (lower is more relevant); the
+        substring mode is a plain ILIKE scan without a rank.
+        """
+        if not search:
+            return stmt, None
+        dialect = self.session.bind.dialect.name
+        terms = _SEARCH_TERM.findall(search)
+        fulltext = settings.SEARCH_MODE == "fulltext" and bool(terms)
+        if fulltext and dialect == "sqlite":
+            query = " ".join(f'"{term}"*' for term in terms)
+            stmt = stmt.join(
+                _songs_fts, _songs_fts.c.track_id == SongModel.track_id
+            ).where(
+                literal_column("songs_fts").op("MATCH")(
+                    f"{{track_name track_artist}} : ({query})"
+                )
             )
-        stmt = stmt.limit(limit).offset(offset)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+            return stmt, _songs_fts.c.rank
+        if fulltext and dialect == "postgresql":
+            document = func.to_tsvector(
+                "simple", SongModel.track_name + " " + SongModel.track_artist
+            )
+            query = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+            stmt = stmt.where(document.op("@@")(query))
+            return stmt, -func.ts_rank(document, query)
+
+        search_pattern = f"%{search}%"
+        stmt = stmt.where(
+            (SongModel.track_name.ilike(search_pattern))
+            | (SongModel.track_artist.ilike(search_pattern))
+        )
+        return stmt, None
+
+    async def stream_features(
+        self, features: list[str], batch_size: int = 10000
+    ) -> AsyncIterator[Sequence[Row]]:
+        columns = [getattr(SongModel, f) for f in features]
+        stmt = select(SongModel.track_id, *columns).execution_options(
+            yield_per=batch_size
+        )
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def feature_fingerprint(self, features: list[str]) -> list:
+        """Aggregates of the catalogue that change with almost any write.
+
+        The row count, the track id bounds and total length, and the sum of
+        each feature in units of 1 / FINGERPRINT_SCALE, read in one aggregate
+        query instead of a scan into Python. Moving a value from one song to
+        another with the same id length is not seen.
+        """
+        stmt = select(
+            func.count(),
+            func.min(SongModel.track_id),
+            func.max(SongModel.track_id),
+            func.sum(func.length(SongModel.track_id)),
+            *(
+                func.sum(
+                    cast(
+                        func.round(getattr(SongModel, f) * FINGERPRINT_SCALE),
+                        BigInteger,
+                    )
+                )
+                for f in features
+            ),
+        )
+        count, first_id, last_id, *sums = (await self.session.execute(stmt)).one()
+        # Integer sums are exact, so they do not depend on the order the
+        # database adds the rows in, unlike sums of floats
+        return [count, first_id, last_id, *(int(x or 0) for x in sums)]
+
+    async def stream_songs(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Every song as plain rows, read through a server-side cursor."""
+        stmt = (
+            select(*SongModel.__table__.columns)
+            .order_by(SongModel.track_id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_by_ids(
+        self, track_ids: list[str], batch_size: int = 500
+    ) -> Sequence[SongModel]:
+        # Chunked to stay under the database limit of bound parameters
+        songs: list[SongModel] = []
+        for i in range(0, len(track_ids), batch_size):
+            stmt = select(SongModel).where(
+                SongModel.track_id.in_(track_ids[i : i + batch_size])
+            )
+            result = await self.session.execute(stmt)
+            songs.extend(result.scalars().all())
+        return songs
 
     async def get_by_id(self, track_id: str) -> SongModel | None:
         stmt = select(SongModel).where(SongModel.track_id == track_id)
@@ -55,3 +243,79 @@ class SongRepository:
     async def bulk_create(self, songs: list[SongModel]):
         self.session.add_all(songs)
         await self.session.commit()
+
+    async def bulk_insert(self, rows: list[tuple]) -> None:
+        """Insert rows given as tuples in `SongModel` column order.
+
+        Runs one driver-level executemany without committing, skipping the
+        ORM unit of work and per-row parameter processing; the caller owns
+        the transaction (see `bulk_load`).
+        """
+        if not rows:
+            return
+        table = SongModel.__table__
+        compiled = insert(table).compile(dialect=self.session.bind.dialect)
+        connection = await self.session.connection()
+        if compiled.positional and list(compiled.positiontup) == table.columns.keys():
+            await connection.exec_driver_sql(str(compiled), rows)
+        else:
+            keys = table.columns.keys()
+            await connection.execute(
+                insert(table), [dict(zip(keys, row)) for row in rows]
+            )
+
+    @asynccontextmanager
+    async def bulk_load(self):
+        """Run a bulk load as one transaction, committed when the block exits.
+
+        On SQLite, fsyncs are skipped while loading (an interrupted load is
+        rolled back and simply rerun) and the full-text insert trigger is
+        replaced by a single statement indexing all new rows at the end. The
+        previous settings are restored afterwards because the connection
+        goes back to the pool.
+        """
+        if self.session.bind.dialect.name != "sqlite":
+            try:
+                yield
+                await self.session.commit()
+            except BaseException:
+                await self.session.rollback()
+                raise
+            return
+
+        async def scalar(sql: str):
+            return (await self.session.execute(text(sql))).scalar()
+
+        synchronous = await scalar("PRAGMA synchronous")
+        cache_size = await scalar("PRAGMA cache_size")
+        await self.session.execute(text("PRAGMA synchronous = OFF"))
+        await self.session.execute(text("PRAGMA cache_size = -65536"))  # 64 MiB
+        try:
+            # pysqlite only opens a transaction before DML statements, so open
+            # it explicitly to keep the trigger swap atomic with the load.
+            await self.session.execute(text("SAVEPOINT bulk_load"))
+            has_trigger = await scalar(
+                "SELECT count(*) FROM sqlite_master "
+                "WHERE type = 'trigger' AND name = 'songs_fts_insert'"
+            )
+            last_rowid = await scalar("SELECT coalesce(max(rowid), 0) FROM songs")
+            if has_trigger:
+                await self.session.execute(text("DROP TRIGGER songs_fts_insert"))
+            yield
+            if has_trigger:
+                await self.session.execute(
+                    text(
+                        "INSERT INTO songs_fts(track_id, track_name, track_artist) "
+                        "SELECT track_id, track_name, track_artist FROM songs "
+                        "WHERE rowid > :last_rowid"
+                    ),
+                    {"last_rowid": last_rowid},
+                )
+                await self.session.execute(text(SONG_SEARCH_SQLITE_INSERT_TRIGGER))
+            await self.session.commit()
+        except BaseException:
+            await self.session.rollback()
+            raise
+        finally:
+            await self.session.execute(text(f"PRAGMA synchronous = {synchronous}"))
+            await self.session.execute(text(f"PRAGMA cache_size = {cache_size}"))
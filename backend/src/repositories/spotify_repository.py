@@ -3,26 +3,29 @@ from src.core.config import settings
 
 
 class SpotifyRepository:
-    def __init__(self):
-        self.base_url = settings.URL_SPOTIFY
+    def __init__(self, client: httpx.AsyncClient):
+        # Pooled client with `URL_SPOTIFY` as base URL (see src/core/http_clients.py)
+        self.client = client
         self.account_url = settings.URL_SPOTIFY_ACCOUNT
         self.basic_auth = settings.SPOTIFY_BASIC_AUTHENTICATION
 
     async def create_token(self) -> str:
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Basic {self.basic_auth}"}
-            data = {"grant_type": "client_credentials"}
-            response = await client.post(self.account_url, headers=headers, data=data)
-            response.raise_for_status()
-            data = response.json()
-            return data["access_token"]
+        access_token, _ = await self.fetch_token()
+        return access_token
+
+    async def fetch_token(self) -> tuple[str, float]:
+        """A new client-credentials access token and its lifetime in seconds."""
+        headers = {"Authorization": f"Basic {self.basic_auth}"}
+        data = {"grant_type": "client_credentials"}
+        response = await self.client.post(self.account_url, headers=headers, data=data)
+        response.raise_for_status()
+        data = response.json()
+        return data["access_token"], float(data.get("expires_in", 3600))
 
     async def search_song(self, name: str, artist: str, token: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            path = f"{self.base_url}/search"
-            query = f"track:{name} artist:{artist}"
-            params = {"q": query, "type": "track", "limit": 1}
-            headers = {"Authorization": f"Bearer {token}"}
-            response = await client.get(path, params=params, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        query = f"track:{name} artist:{artist}"
+        params = {"q": query, "type": "track", "limit": 1}
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self.client.get("/search", params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,27 @@
+from collections.abc import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.track_audio import TrackAudioModel
+
+
+class TrackAudioRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_many(
+        self, track_ids: list[str], batch_size: int = 500
+    ) -> Sequence[TrackAudioModel]:
+        # Chunked to stay under the database limit of bound parameters
+        track_audio: list[TrackAudioModel] = []
+        for i in range(0, len(track_ids), batch_size):
+            stmt = select(TrackAudioModel).where(
+                TrackAudioModel.track_id.in_(track_ids[i : i + batch_size])
+            )
+            result = await self.session.execute(stmt)
+            track_audio.extend(result.scalars().all())
+        return track_audio
+
+    async def save(self, track_audio: TrackAudioModel) -> None:
+        await self.session.merge(track_audio)
+        await self.session.commit()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.utils.cache import TTLCache
+from src.utils.concurrency import SingleFlight
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    # The GET /music/audio/{track_id} response
+    result: dict
+    # Unix time of the Deezer lookup
+    fetched_at: float
+
+    @property
+    def found(self) -> bool:
+        return "error" not in self.result
+
+
+class AudioCache:
+    """In-process tier of the Deezer metadata cache and its background refreshes.
+
+    The persisted tier is the `track_audio` table. An entry is fresh for
+    `AUDIO_CACHE_TTL_SECONDS`; after that it is stale but still served for
+    `AUDIO_CACHE_STALE_SECONDS` while a refresh runs in the background.
+    Negative entries ("not found on Deezer") are simply dropped after
+    `AUDIO_CACHE_NEGATIVE_TTL_SECONDS`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        session_factory: async_sessionmaker[AsyncSession],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.memory: TTLCache[CachedAudio] = TTLCache(maxsize, clock)
+        # Background refreshes outlive the request, so they open their own session
+        self.session_factory = session_factory
+        self._clock = clock
+        # One Deezer lookup per track at a time, shared by every request
+        self._lookups = SingleFlight()
+
+    def _expires_at(self, entry: CachedAudio) -> float:
+        if not entry.found:
+            return entry.fetched_at + settings.AUDIO_CACHE_NEGATIVE_TTL_SECONDS
+        return (
+            entry.fetched_at
+            + settings.AUDIO_CACHE_TTL_SECONDS
+            + settings.AUDIO_CACHE_STALE_SECONDS
+        )
+
+    def is_usable(self, entry: CachedAudio) -> bool:
+        return self._clock() < self._expires_at(entry)
+
+    def is_stale(self, entry: CachedAudio) -> bool:
+        age = self._clock() - entry.fetched_at
+        return entry.found and age >= settings.AUDIO_CACHE_TTL_SECONDS
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self.memory
+
+    def stats(self) -> dict:
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            "size": len(self.memory),
+            "hits": self.memory.hits,
+            "misses": self.memory.misses,
+            "hit_rate": round(self.memory.hits / lookups, 3) if lookups else None,
+        }
+
+    def get(self, track_id: str) -> CachedAudio | None:
+        cached = self.memory.get(track_id)
+        return cached.value if cached else None
+
+    def put(self, track_id: str, entry: CachedAudio) -> None:
+        ttl = self._expires_at(entry) - self._clock()
+        if ttl > 0:
+            self.memory.set(track_id, entry, ttl)
+
+    async def lookup(
+        self, track_id: str, fetch: Callable[[], Awaitable[CachedAudio]]
+    ) -> CachedAudio:
+        """Run `fetch`, or join the lookup already running for this track."""
+        return await self._lookups.do(track_id, fetch)
+
+    def refresh_in_background(
+        self, track_id: str, refresh: Callable[[], Awaitable[CachedAudio]]
+    ) -> None:
+        """Run `refresh` unless a lookup is already running for this track."""
+        if not self._lookups.in_flight(track_id):
+            future = self._lookups.start(track_id, refresh)
+            future.add_done_callback(_report_refresh_error)
+
+
+def _report_refresh_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Error refreshing audio metadata: {future.exception()}")
+
+
+audio_cache = AudioCache(settings.AUDIO_CACHE_SIZE, AsyncSessionLocal)
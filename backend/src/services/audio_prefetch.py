@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.services.music_service import MusicService
+
+
+class AudioPrefetcher:
+    """Warms the audio metadata cache for tracks the client is about to play.
+
+    Recommendation routes enqueue the track ids they return and a background
+    worker resolves them in batches, so the follow-up GET /music/audio calls
+    are served from memory. Enqueueing never waits: ids already queued are
+    skipped and ids that do not fit in the queue are dropped.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int):
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+        # Queued or being resolved
+        self._pending: set[str] = set()
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.already_cached = 0
+        self.prefetched = 0
+        self.failed_batches = 0
+
+    def enqueue(self, track_ids: list[str]) -> None:
+        for track_id in track_ids:
+            if track_id in self._pending:
+                self.deduplicated += 1
+                continue
+            try:
+                self._queue.put_nowait(track_id)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                continue
+            self._pending.add(track_id)
+            self.enqueued += 1
+
+    async def join(self) -> None:
+        """Wait until every queued track has been resolved."""
+        await self._queue.join()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "already_cached": self.already_cached,
+            "prefetched": self.prefetched,
+            "failed_batches": self.failed_batches,
+        }
+
+    async def _next_batch(self) -> list[str]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def run(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        make_service: Callable[[AsyncSession], MusicService],
+    ) -> None:
+        """Resolve queued tracks until cancelled, one session per batch."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                async with session_factory() as session:
+                    looked_up = await make_service(session).prefetch_audio(batch)
+                self.prefetched += looked_up
+                self.already_cached += len(batch) - looked_up
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"Error prefetching audio metadata: {e}")
+            finally:
+                self._pending.difference_update(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+
+audio_prefetcher = AudioPrefetcher(
+    settings.AUDIO_PREFETCH_QUEUE_SIZE, settings.AUDIO_PREFETCH_BATCH_SIZE
+)
@@ -1,6 +1,17 @@
+import asyncio
+import time
+
+import httpx
+
+from src.core.config import settings
+from src.domain.models.song import SongModel
+from src.domain.models.track_audio import TrackAudioModel
 from src.repositories.deezer_repository import DeezerRepository
 from src.repositories.song_repository import SongRepository
 from src.repositories.spotify_repository import SpotifyRepository
+from src.repositories.track_audio_repository import TrackAudioRepository
+from src.services.audio_cache import AudioCache, CachedAudio
+from src.services.spotify_token import SpotifyTokenManager
 
 
 class MusicService:
@@ -9,42 +20,176 @@ class MusicService:
         song_repo: SongRepository,
         deezer_repo: DeezerRepository,
         spotify_repo: SpotifyRepository,
+        spotify_tokens: SpotifyTokenManager,
+        track_audio_repo: TrackAudioRepository,
+        audio_cache: AudioCache,
     ):
         self.song_repo = song_repo
         self.deezer_repo = deezer_repo
         self.spotify_repo = spotify_repo
+        self.spotify_tokens = spotify_tokens
+        self.track_audio_repo = track_audio_repo
+        self.audio_cache = audio_cache
 
     async def get_song_audio(self, track_id: str) -> dict:
-        # 1. Fetch song from database repository
-        song = await self.song_repo.get_by_id(track_id)
-        if not song:
-            return {"error": "Song not found in database"}
+        return (await self.get_songs_audio([track_id]))[track_id]
 
-        # 2. Search song on Deezer (no auth required)
-        try:
-            deezer_result = await self.deezer_repo.search_song(
-                song.track_name, song.track_artist
-            )
+    async def get_songs_audio(self, track_ids: list[str]) -> dict[str, dict]:
+        """Deezer metadata of each track, keyed by track id.
 
-            tracks = deezer_result.get("data", [])
-            if not tracks:
-                return {"error": "Song not found on Deezer"}
+        A track that cannot be resolved gets an {"error": ...} value instead
+        of failing the others. Repeated ids are looked up once.
+        """
+        track_ids = list(dict.fromkeys(track_ids))
+        results: dict[str, dict] = {}
 
-            # Pick the first result
-            track_info = tracks[0]
+        # Serve cached Deezer lookups from memory, resolve the rest
+        missing = []
+        for track_id in track_ids:
+            entry = self.audio_cache.get(track_id)
+            if entry is None:
+                missing.append(track_id)
+            else:
+                results[track_id] = self._serve_cached(track_id, entry)
+        results.update(await self._resolve_audio(missing))
 
-            return {
-                "track_id": track_id,
+        return {
+            track_id: results.get(track_id, {"error": "Song not found in database"})
+            for track_id in track_ids
+        }
+
+    async def prefetch_audio(self, track_ids: list[str]) -> int:
+        """Warm the cache for the tracks not in memory yet.
+
+        Returns how many tracks were not in memory. Unlike `get_songs_audio`
+        this does not count towards the cache hit rate.
+        """
+        missing = [t for t in dict.fromkeys(track_ids) if t not in self.audio_cache]
+        await self._resolve_audio(missing)
+        return len(missing)
+
+    async def _resolve_audio(self, track_ids: list[str]) -> dict[str, dict]:
+        """Look up tracks missing from memory: persisted first, then Deezer.
+
+        Tracks that are not in the database are left out of the result.
+        """
+        results: dict[str, dict] = {}
+        if not track_ids:
+            return results
+
+        # 1. Fetch the songs and their persisted lookups from the database
+        songs = await self.song_repo.get_by_ids(track_ids)
+        persisted = {
+            track_audio.track_id: track_audio
+            for track_audio in await self.track_audio_repo.get_many(track_ids)
+        }
+        to_search = []
+        for song in songs:
+            entry = None
+            if song.track_id in persisted:
+                entry = self._from_persisted(persisted[song.track_id], song)
+            if entry is not None and self.audio_cache.is_usable(entry):
+                self.audio_cache.put(song.track_id, entry)
+                results[song.track_id] = self._serve_cached(song.track_id, entry)
+            else:
+                to_search.append(song)
+
+        # 2. Search the rest on Deezer (no auth required), a few at a time
+        semaphore = asyncio.Semaphore(settings.AUDIO_BATCH_CONCURRENCY)
+
+        async def search(song: SongModel) -> dict:
+            async with semaphore:
+                try:
+                    entry = await self.audio_cache.lookup(
+                        song.track_id,
+                        lambda: self._fetch_audio(
+                            song.track_id, song.track_name, song.track_artist
+                        ),
+                    )
+                except Exception as e:
+                    return {"error": f"Failed to search song on Deezer: {str(e)}"}
+            return entry.result
+
+        found = await asyncio.gather(*(search(song) for song in to_search))
+        results.update(zip((song.track_id for song in to_search), found))
+        return results
+
+    def _serve_cached(self, track_id: str, entry: CachedAudio) -> dict:
+        if self.audio_cache.is_stale(entry):
+            track_name = entry.result["track_name"]
+            track_artist = entry.result["track_artist"]
+            self.audio_cache.refresh_in_background(
+                track_id,
+                lambda: self._fetch_audio(track_id, track_name, track_artist),
+            )
+        return entry.result
+
+    @staticmethod
+    def _from_persisted(track_audio: TrackAudioModel, song: SongModel) -> CachedAudio:
+        if not track_audio.found:
+            return CachedAudio(
+                {"error": "Song not found on Deezer"}, track_audio.fetched_at
+            )
+        return CachedAudio(
+            {
+                "track_id": song.track_id,
                 "track_name": song.track_name,
                 "track_artist": song.track_artist,
-                "deezer_id": track_info.get("id"),
-                "preview_url": track_info.get("preview"),
-                "external_url": track_info.get("link"),
-                "album_image": track_info.get("album", {}).get("cover_xl")
-                or track_info.get("artist", {}).get("picture_xl"),
-            }
-        except Exception as e:
-            return {"error": f"Failed to search song on Deezer: {str(e)}"}
+                "deezer_id": track_audio.deezer_id,
+                "preview_url": track_audio.preview_url,
+                "external_url": track_audio.external_url,
+                "album_image": track_audio.album_image,
+            },
+            track_audio.fetched_at,
+        )
+
+    async def _search_deezer(
+        self, track_id: str, track_name: str, track_artist: str
+    ) -> CachedAudio:
+        fetched_at = time.time()
+        deezer_result = await self.deezer_repo.search_song(track_name, track_artist)
+
+        tracks = deezer_result.get("data", [])
+        if not tracks:
+            return CachedAudio({"error": "Song not found on Deezer"}, fetched_at)
+
+        # Pick the first result
+        track_info = tracks[0]
+        result = {
+            "track_id": track_id,
+            "track_name": track_name,
+            "track_artist": track_artist,
+            "deezer_id": track_info.get("id"),
+            "preview_url": track_info.get("preview"),
+            "external_url": track_info.get("link"),
+            "album_image": track_info.get("album", {}).get("cover_xl")
+            or track_info.get("artist", {}).get("picture_xl"),
+        }
+        return CachedAudio(result, fetched_at)
+
+    async def _fetch_audio(
+        self, track_id: str, track_name: str, track_artist: str
+    ) -> CachedAudio:
+        """Search Deezer and store the result in both cache tiers.
+
+        Shared by concurrent requests and background refreshes, so it writes
+        through its own session rather than the request's.
+        """
+        entry = await self._search_deezer(track_id, track_name, track_artist)
+        self.audio_cache.put(track_id, entry)
+        async with self.audio_cache.session_factory() as session:
+            await TrackAudioRepository(session).save(
+                TrackAudioModel(
+                    track_id=track_id,
+                    found=entry.found,
+                    deezer_id=entry.result.get("deezer_id"),
+                    preview_url=entry.result.get("preview_url"),
+                    external_url=entry.result.get("external_url"),
+                    album_image=entry.result.get("album_image"),
+                    fetched_at=entry.fetched_at,
+                )
+            )
+        return entry
 
     async def get_song_audio_spotify(self, track_id: str) -> dict:
         # Keeping spotify logic just in case or if needed as fallback
@@ -53,10 +198,20 @@ class MusicService:
             return {"error": "Song not found in database"}
 
         try:
-            token = await self.spotify_repo.create_token()
-            spotify_result = await self.spotify_repo.search_song(
-                song.track_name, song.track_artist, token
-            )
+            token = await self.spotify_tokens.get_token(self.spotify_repo)
+            try:
+                spotify_result = await self.spotify_repo.search_song(
+                    song.track_name, song.track_artist, token
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 401:
+                    raise
+                # Revoked before its expiry: retry once with a new token
+                self.spotify_tokens.invalidate()
+                token = await self.spotify_tokens.get_token(self.spotify_repo)
+                spotify_result = await self.spotify_repo.search_song(
+                    song.track_name, song.track_artist, token
+                )
             tracks = spotify_result.get("tracks", {}).get("items", [])
             if not tracks:
                 return {"error": "Song not found on Spotify"}
@@ -0,0 +1,153 @@
+from typing import Protocol
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors  # type: ignore
+
+from src.core.config import settings
+
+EXACT_BACKENDS = ("ball_tree", "kd_tree", "brute")
+
+
+class NeighborBackend(Protocol):
+    """The subset of the `NearestNeighbors` API the recommendation index uses."""
+
+    def fit(self, vectors: np.ndarray) -> "NeighborBackend": ...
+
+    def kneighbors(
+        self, vectors: np.ndarray, n_neighbors: int
+    ) -> tuple[np.ndarray, np.ndarray]: ...
+
+
+def _squared_distances(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return (
+        (vectors**2).sum(axis=1)[:, None]
+        - 2 * vectors @ centroids.T
+        + (centroids**2).sum(axis=1)[None, :]
+    )
+
+
+def _nearest_centroid(
+    vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192
+) -> np.ndarray:
+    # ||x||² is the same for every centroid, so it can be left out of argmin
+    centroid_norms = (centroids**2).sum(axis=1)
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start : start + chunk_size]
+        scores = chunk @ centroids.T
+        scores *= -2
+        scores += centroid_norms
+        assignments[start : start + chunk_size] = scores.argmin(axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """Approximate nearest neighbours with an inverted file (IVF-Flat) index.
+
+    Vectors are clustered with k-means into `n_lists` cells and stored grouped
+    by cell. A query only scans the `n_probes` cells whose centroids are
+    closest to it, so `n_probes` trades recall for latency: probing every
+    cell gives exact results.
+    """
+
+    def __init__(
+        self,
+        n_lists: int = 0,
+        n_probes: int = 8,
+        n_iter: int = 10,
+        samples_per_list: int = 64,
+        random_state: int = 0,
+    ):
+        self.n_lists = n_lists
+        self.n_probes = n_probes
+        self.n_iter = n_iter
+        self.samples_per_list = samples_per_list
+        self.random_state = random_state
+
+    def fit(self, vectors: np.ndarray) -> "IVFIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_samples = len(vectors)
+        n_lists = self.n_lists or int(np.sqrt(n_samples))
+        n_lists = max(1, min(n_lists, n_samples))
+
+        # Train the coarse quantizer on a sample of the catalogue
+        rng = np.random.default_rng(self.random_state)
+        sample_size = min(n_samples, n_lists * self.samples_per_list)
+        sample = vectors[rng.choice(n_samples, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)]
+        for _ in range(self.n_iter):
+            assignments = _nearest_centroid(sample, centroids)
+            counts = np.bincount(assignments, minlength=n_lists)
+            sums = np.stack(
+                [
+                    np.bincount(assignments, weights=sample[:, d], minlength=n_lists)
+                    for d in range(vectors.shape[1])
+                ],
+                axis=1,
+            )
+            filled = counts > 0
+            centroids = centroids.copy()
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        # Store the vectors grouped by cell so each probe is a contiguous scan
+        assignments = _nearest_centroid(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+
+        self.centroids_ = centroids.astype(np.float32)
+        self.offsets_ = np.concatenate([[0], np.cumsum(counts)])
+        self.indices_ = order
+        self.vectors_ = vectors[order]
+        return self
+
+    def kneighbors(
+        self, vectors: np.ndarray, n_neighbors: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = len(self.centroids_)
+        cell_order = np.argsort(_squared_distances(vectors, self.centroids_), axis=1)
+
+        distances = np.empty((len(vectors), n_neighbors))
+        indices = np.empty((len(vectors), n_neighbors), dtype=np.int64)
+        for i, vector in enumerate(vectors):
+            # Probe at least `n_probes` cells, and more if they hold fewer
+            # than `n_neighbors` vectors.
+            n_probes = min(self.n_probes, n_lists)
+            sizes = np.diff(self.offsets_)[cell_order[i]]
+            covered = np.cumsum(sizes)
+            n_probes = max(n_probes, int(np.searchsorted(covered, n_neighbors)) + 1)
+            cells = cell_order[i, :n_probes]
+
+            candidates = np.concatenate(
+                [np.arange(self.offsets_[c], self.offsets_[c + 1]) for c in cells]
+            )
+            candidate_distances = np.sqrt(
+                ((self.vectors_[candidates] - vector) ** 2).sum(axis=1)
+            )
+            top = np.argpartition(candidate_distances, n_neighbors - 1)[:n_neighbors]
+            top = top[np.argsort(candidate_distances[top], kind="stable")]
+            distances[i] = candidate_distances[top]
+            indices[i] = self.indices_[candidates[top]]
+        return distances, indices
+
+
+def create_backend(n_samples: int) -> NeighborBackend:
+    """Build the neighbour search backend selected by `RECOMMENDER_BACKEND`.
+
+    "auto" uses the exact ball tree for small catalogues and switches to the
+    approximate IVF index from `RECOMMENDER_ANN_MIN_SONGS` songs onwards.
+    """
+    backend = settings.RECOMMENDER_BACKEND
+    if backend == "auto":
+        backend = (
+            "ivf" if n_samples >= settings.RECOMMENDER_ANN_MIN_SONGS else "ball_tree"
+        )
+
+    if backend in EXACT_BACKENDS:
+        return NearestNeighbors(algorithm=backend)
+    if backend == "ivf":
+        return IVFIndex(
+            n_lists=settings.RECOMMENDER_IVF_LISTS,
+            n_probes=settings.RECOMMENDER_IVF_PROBES,
+        )
+    raise ValueError(f"Unknown recommender backend: {settings.RECOMMENDER_BACKEND}")
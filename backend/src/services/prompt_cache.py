@@ -0,0 +1,193 @@
+import re
+import time
+import unicodedata
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.domain.models.prompt_features import PromptFeaturesModel
+from src.domain.schemas.song import SongFeatures
+from src.repositories.prompt_features_repository import PromptFeaturesRepository
+from src.utils.cache import TTLCache
+from src.utils.concurrency import SingleFlight
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, punctuation and whitespace do not change what a prompt asks for."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(re.findall(r"\w+", text))
+
+
+def trigrams(prompt: str) -> frozenset[str]:
+    padded = f"  {prompt} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class CachedFeatures:
+    features: SongFeatures
+    # Unix time of the agent call
+    created_at: float
+
+
+class PromptCache:
+    """In-process tier of the cache of features extracted from text prompts.
+
+    The persisted tier is the `prompt_features` table. Prompts are keyed by
+    `normalize_prompt`; when `similarity` is above zero, a prompt found in
+    neither tier may also be answered by a cached one whose character
+    trigrams overlap at least that much (Jaccard similarity), so
+    "upbeat party songs" reuses "upbeat party song". Trigrams do not
+    measure meaning: "music with vocals for studying" and "music without
+    vocals for studying" overlap 0.8, so the lookup is off by default.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        similarity: float,
+        session_factory: async_sessionmaker[AsyncSession],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.memory: TTLCache[CachedFeatures] = TTLCache(maxsize, clock)
+        self.similarity = similarity
+        # Agent answers are shared by concurrent requests, so they are
+        # persisted through their own session
+        self.session_factory = session_factory
+        self._clock = clock
+        self._lookups = SingleFlight()
+        # Trigrams of the cached prompts and the prompts containing each one
+        self._grams: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self.loaded = False
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.similar_hits + self.persisted_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self.memory),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "persisted_hits": self.persisted_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    def is_usable(self, entry: CachedFeatures) -> bool:
+        return self._clock() < entry.created_at + settings.PROMPT_CACHE_TTL_SECONDS
+
+    def get(self, prompt: str) -> CachedFeatures | None:
+        """The cached features of `prompt` (normalized)."""
+        cached = self.memory.get(prompt)
+        if cached is None:
+            return None
+        self.exact_hits += 1
+        return cached.value
+
+    def get_similar(self, prompt: str) -> CachedFeatures | None:
+        """The cached features of a prompt similar to `prompt`, if enabled."""
+        # A concurrent request may have cached `prompt` itself meanwhile
+        exact = self.get(prompt)
+        if exact is not None:
+            return exact
+        similar = self._most_similar(prompt)
+        if similar is not None:
+            cached = self.memory.get(similar)
+            if cached is not None:
+                self.similar_hits += 1
+                return cached.value
+        return None
+
+    def put(self, prompt: str, entry: CachedFeatures) -> None:
+        ttl = entry.created_at + settings.PROMPT_CACHE_TTL_SECONDS - self._clock()
+        if ttl <= 0:
+            return
+        self.memory.set(prompt, entry, ttl)
+        if self.similarity > 0 and prompt not in self._grams:
+            grams = trigrams(prompt)
+            self._grams[prompt] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(prompt)
+
+    def _forget(self, prompt: str) -> None:
+        for gram in self._grams.pop(prompt, ()):
+            prompts = self._postings[gram]
+            prompts.discard(prompt)
+            if not prompts:
+                del self._postings[gram]
+
+    def _most_similar(self, prompt: str) -> str | None:
+        if self.similarity <= 0:
+            return None
+        grams = trigrams(prompt)
+        # Trigrams shared with every cached prompt that has at least one
+        shared = Counter(
+            other for gram in grams for other in self._postings.get(gram, ())
+        )
+        best, best_score = None, self.similarity
+        for other, count in shared.items():
+            if other not in self.memory:
+                # Expired or evicted since it was indexed
+                self._forget(other)
+                continue
+            score = count / (len(grams) + len(self._grams[other]) - count)
+            if score >= best_score:
+                best, best_score = other, score
+        return best
+
+    async def load(self, repo: PromptFeaturesRepository) -> None:
+        """Fill the memory tier with the most recent persisted prompts."""
+        since = self._clock() - settings.PROMPT_CACHE_TTL_SECONDS
+        rows = await repo.get_recent(settings.MODEL, since, self.memory.maxsize)
+        for row in reversed(rows):
+            self.put(row.prompt, self._from_persisted(row))
+        self.loaded = True
+
+    async def get_persisted(
+        self, repo: PromptFeaturesRepository, prompt: str
+    ) -> CachedFeatures | None:
+        row = await repo.get(prompt, settings.MODEL)
+        if row is None:
+            return None
+        entry = self._from_persisted(row)
+        if not self.is_usable(entry):
+            return None
+        self.put(prompt, entry)
+        self.persisted_hits += 1
+        return entry
+
+    async def save(self, prompt: str, entry: CachedFeatures) -> None:
+        self.put(prompt, entry)
+        async with self.session_factory() as session:
+            await PromptFeaturesRepository(session).save(
+                PromptFeaturesModel(
+                    prompt=prompt,
+                    model=settings.MODEL,
+                    features=entry.features.model_dump(),
+                    created_at=entry.created_at,
+                )
+            )
+
+    async def lookup(
+        self, prompt: str, extract: Callable[[], Awaitable[CachedFeatures]]
+    ) -> CachedFeatures:
+        """Run `extract`, or join the one already running for this prompt."""
+        self.misses += 1
+        return await self._lookups.do(prompt, extract)
+
+    @staticmethod
+    def _from_persisted(row: PromptFeaturesModel) -> CachedFeatures:
+        return CachedFeatures(SongFeatures.model_validate(row.features), row.created_at)
+
+
+prompt_cache = PromptCache(
+    settings.PROMPT_CACHE_SIZE, settings.PROMPT_CACHE_SIMILARITY, AsyncSessionLocal
+)
@@ -0,0 +1,75 @@
+import time
+from collections.abc import Callable, Hashable
+
+import numpy as np
+
+from src.core.config import settings
+from src.utils.cache import TTLCache
+
+
+class RecommendationCache:
+    """Recommended track ids per query, valid for one version of the index.
+
+    Any song write or rebuild changes the index version, and the first
+    lookup against a new version empties the cache. Only track ids are kept,
+    so an entry costs a few hundred bytes; the songs are still read from the
+    database for every response.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        quantum: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.memory: TTLCache[list[str]] = TTLCache(maxsize, clock)
+        self.ttl = ttl
+        self.quantum = quantum
+        self._version: int | None = None
+
+    def seed_key(self, song_ids: list[str], n_songs: int) -> Hashable:
+        return ("seeds", tuple(sorted(song_ids)), n_songs)
+
+    def vector_key(self, vector: np.ndarray, n_songs: int) -> Hashable:
+        # Scaled queries closer than `quantum` on every feature share an
+        # entry; NaN marks a feature the query leaves out
+        vector = np.asarray(vector)
+        missing = np.isnan(vector)
+        quantized = np.round(np.nan_to_num(vector) / self.quantum).astype(np.int64)
+        return ("vector", quantized.tobytes(), missing.tobytes(), n_songs)
+
+    def _is_current(self, version: int) -> bool:
+        """Whether `version` is the newest one seen; a newer one clears the cache."""
+        if self._version is None or version > self._version:
+            self.memory.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: Hashable, version: int) -> list[str] | None:
+        if not self._is_current(version):
+            return None
+        cached = self.memory.get(key)
+        return cached.value if cached else None
+
+    def put(self, key: Hashable, version: int, track_ids: list[str]) -> None:
+        # Results computed against an older index are dropped
+        if self._is_current(version):
+            self.memory.set(key, track_ids, self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            "size": len(self.memory),
+            "index_version": self._version,
+            "hits": self.memory.hits,
+            "misses": self.memory.misses,
+            "hit_rate": round(self.memory.hits / lookups, 3) if lookups else None,
+        }
+
+
+recommendation_cache = RecommendationCache(
+    settings.RECOMMENDATION_CACHE_SIZE,
+    settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+    settings.RECOMMENDATION_CACHE_QUANTUM,
+)
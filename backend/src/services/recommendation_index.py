@@ -0,0 +1,790 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler  # type: ignore
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.repositories.feature_store import FeatureStore
+from src.repositories.index_store import (
+    IndexStore,
+    catalogue_digest,
+    fingerprint_digest,
+)
+from src.repositories.song_repository import FINGERPRINT_SCALE, SongRepository
+from src.services.neighbor_backends import NeighborBackend, create_backend
+
+FEATURES = [
+    "danceability",
+    "energy",
+    "key",
+    "loudness",
+    "speechiness",
+    "acousticness",
+    "instrumentalness",
+    "liveness",
+    "valence",
+    "tempo",
+]
+FEATURE_DTYPE = np.float32
+
+
+class SortedTrackIds:
+    """Row lookup by binary search over the sorted track ids.
+
+    Stands in for the `pd.Index` of snapshots mapped from an `IndexStore`:
+    both arrays are shared memory maps, where a hash index would hold a copy
+    of every track id in each worker.
+    """
+
+    def __init__(self, sorted_track_ids: np.ndarray, order: np.ndarray):
+        self.sorted_track_ids = sorted_track_ids
+        # Row of each sorted track id
+        self.order = order
+
+    def get_indexer(self, track_ids: list[str]) -> np.ndarray:
+        keys = np.asarray(track_ids, dtype=str)
+        if len(self.sorted_track_ids) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        found = np.searchsorted(self.sorted_track_ids, keys)
+        found = found.clip(max=len(self.sorted_track_ids) - 1)
+        matched = self.sorted_track_ids[found] == keys
+        return np.where(matched, self.order[found], -1)
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    track_ids: np.ndarray
+    # Hash index from track_id to row, looked up in bulk with get_indexer
+    positions: pd.Index | SortedTrackIds
+    raw_features: np.ndarray
+    scaled_features: np.ndarray
+    scaler: MinMaxScaler | None
+    nn_model: NeighborBackend | None
+    # Feature-major copy of `scaled_features`, one contiguous row per
+    # feature, for queries over a subset of the features
+    scaled_columns: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.track_ids)
+
+    def transform(self, raw_vectors: np.ndarray) -> np.ndarray:
+        if self.scaler is None:
+            return raw_vectors
+        return self.scaler.transform(raw_vectors)
+
+    def position(self, track_id: str) -> int | None:
+        position = self.positions.get_indexer([track_id])[0]
+        return None if position < 0 else int(position)
+
+
+def _empty_matrix() -> np.ndarray:
+    return np.empty((0, len(FEATURES)), dtype=FEATURE_DTYPE)
+
+
+def _build_params() -> dict:
+    """Settings a published index was fitted with; others need a new fit."""
+    return {
+        "features": FEATURES,
+        "backend": settings.RECOMMENDER_BACKEND,
+        "ann_min_songs": settings.RECOMMENDER_ANN_MIN_SONGS,
+        "ivf_lists": settings.RECOMMENDER_IVF_LISTS,
+        "ivf_probes": settings.RECOMMENDER_IVF_PROBES,
+    }
+
+
+def _rows_match_fingerprint(
+    fingerprint: list, track_ids: np.ndarray, raw_features: np.ndarray
+) -> bool:
+    """Whether `SongRepository.feature_fingerprint` may describe these rows.
+
+    The track id bounds are not compared, as the database may collate ids
+    differently from NumPy. The feature sums are compared within the
+    float32 rounding of the rows and the quantization of the database sums.
+    """
+    count, _, _, id_length, *sums = fingerprint
+    if count != len(track_ids):
+        return False
+    if id_length != int(np.char.str_len(np.asarray(track_ids, dtype=str)).sum()):
+        return False
+    raw = np.asarray(raw_features, dtype=np.float64)
+    tolerance = np.abs(raw).sum(axis=0) * 2.0**-24 + count * 0.5 / FINGERPRINT_SCALE
+    difference = raw.sum(axis=0) - np.array(sums, dtype=np.float64) / FINGERPRINT_SCALE
+    return bool(np.all(np.abs(difference) <= tolerance))
+
+
+@dataclass(frozen=True)
+class IndexState:
+    """A fitted snapshot plus the writes applied since it was fitted.
+
+    Inserted and updated songs live in a small delta that is searched by brute
+    force, while deleted or superseded snapshot rows are tombstoned. States are
+    immutable so a query always sees a consistent view.
+    """
+
+    snapshot: IndexSnapshot
+    version: int = 0
+    tombstones: frozenset[int] = frozenset()
+    delta_ids: tuple[str, ...] = ()
+    delta_positions: pd.Index = field(default_factory=lambda: pd.Index([]))
+    delta_raw: np.ndarray = field(default_factory=_empty_matrix)
+    delta_scaled: np.ndarray = field(default_factory=_empty_matrix)
+
+    @property
+    def size(self) -> int:
+        return self.snapshot.size - len(self.tombstones) + len(self.delta_ids)
+
+    @property
+    def pending_changes(self) -> int:
+        return len(self.tombstones) + len(self.delta_ids)
+
+    def raw_vector(self, track_id: str) -> np.ndarray | None:
+        row = self.locate([track_id])[0]
+        if row < 0:
+            return None
+        if row >= self.snapshot.size:
+            return self.delta_raw[row - self.snapshot.size]
+        return self.snapshot.raw_features[row]
+
+    def locate(self, track_ids: list[str]) -> np.ndarray:
+        """Row of each track id, or -1 for unknown and deleted songs.
+
+        Snapshot rows come first, delta rows are numbered after them.
+        """
+        rows = self.snapshot.positions.get_indexer(track_ids)
+        if self.tombstones:
+            dead = np.fromiter(self.tombstones, dtype=np.int64)
+            rows[np.isin(rows, dead)] = -1
+        if self.delta_ids:
+            delta_rows = self.delta_positions.get_indexer(track_ids)
+            rows = np.where(delta_rows >= 0, self.snapshot.size + delta_rows, rows)
+        return rows
+
+    def scaled_rows(self, rows: np.ndarray) -> np.ndarray:
+        if not self.delta_ids:
+            return self.snapshot.scaled_features[rows]
+        in_delta = rows >= self.snapshot.size
+        scaled = np.empty((len(rows), len(FEATURES)), dtype=FEATURE_DTYPE)
+        scaled[~in_delta] = self.snapshot.scaled_features[rows[~in_delta]]
+        scaled[in_delta] = self.delta_scaled[rows[in_delta] - self.snapshot.size]
+        return scaled
+
+    def seed_vectors(
+        self, song_id_lists: list[list[str]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Mean scaled vector of each list of seed songs.
+
+        Returns the means of the lists that have at least one known song,
+        along with a boolean mask telling which lists those are.
+        """
+        lengths = [len(song_ids) for song_ids in song_id_lists]
+        list_of_seed = np.repeat(np.arange(len(song_id_lists)), lengths)
+        rows = self.locate([t for song_ids in song_id_lists for t in song_ids])
+        known = rows >= 0
+
+        counts = np.bincount(list_of_seed[known], minlength=len(song_id_lists))
+        has_seeds = counts > 0
+        if not has_seeds.any():
+            return _empty_matrix(), has_seeds
+
+        # Seeds are grouped by list, so each list is one contiguous segment
+        starts = np.cumsum(counts) - counts
+        seeds = self.scaled_rows(rows[known]).astype(np.float64)
+        sums = np.add.reduceat(seeds, starts[has_seeds], axis=0)
+        return sums / counts[has_seeds, None], has_seeds
+
+    def with_delta(
+        self, delta: dict[str, np.ndarray], tombstones: frozenset[int]
+    ) -> "IndexState":
+        delta_raw = np.vstack(list(delta.values())) if delta else _empty_matrix()
+        return IndexState(
+            snapshot=self.snapshot,
+            version=self.version + 1,
+            tombstones=tombstones,
+            delta_ids=tuple(delta),
+            delta_positions=pd.Index(list(delta)),
+            delta_raw=delta_raw,
+            delta_scaled=self.snapshot.transform(delta_raw) if delta else delta_raw,
+        )
+
+    def upsert(self, track_id: str, raw_vector: np.ndarray) -> "IndexState":
+        current = self.raw_vector(track_id)
+        if current is not None and np.array_equal(current, raw_vector):
+            return self
+        delta = dict(zip(self.delta_ids, self.delta_raw))
+        delta[track_id] = raw_vector
+        tombstones = self.tombstones
+        position = self.snapshot.position(track_id)
+        if position is not None:
+            tombstones = tombstones | {position}
+        return self.with_delta(delta, tombstones)
+
+    def remove(self, track_id: str) -> "IndexState":
+        if self.raw_vector(track_id) is None:
+            return self
+        delta = dict(zip(self.delta_ids, self.delta_raw))
+        delta.pop(track_id, None)
+        tombstones = self.tombstones
+        position = self.snapshot.position(track_id)
+        if position is not None:
+            tombstones = tombstones | {position}
+        return self.with_delta(delta, tombstones)
+
+    def with_writes(
+        self, writes: list[tuple[str, np.ndarray | None]]
+    ) -> "IndexState":
+        state = self
+        for track_id, raw_vector in writes:
+            if raw_vector is None:
+                state = state.remove(track_id)
+            else:
+                state = state.upsert(track_id, raw_vector)
+        return state
+
+    def pending_writes(self) -> list[tuple[str, np.ndarray | None]]:
+        """The writes applied on top of the snapshot, as removals and upserts."""
+        upserted = set(self.delta_ids)
+        dead = self.snapshot.track_ids[sorted(self.tombstones)].tolist()
+        removed = [(track_id, None) for track_id in dead if track_id not in upserted]
+        return removed + list(zip(self.delta_ids, self.delta_raw))
+
+    def live_rows(self) -> tuple[np.ndarray, np.ndarray]:
+        keep = np.ones(self.snapshot.size, dtype=bool)
+        keep[list(self.tombstones)] = False
+        track_ids = np.concatenate(
+            [self.snapshot.track_ids[keep], np.array(self.delta_ids, dtype=object)]
+        )
+        raw_features = np.vstack([self.snapshot.raw_features[keep], self.delta_raw])
+        return track_ids, raw_features
+
+    def query(self, vectors: np.ndarray, n_songs: int) -> list[list[str]]:
+        k_neighbors = min(n_songs, self.size)
+        if k_neighbors <= 0 or len(vectors) == 0:
+            return [[] for _ in range(len(vectors))]
+
+        distances = np.empty((len(vectors), 0))
+        track_ids = np.empty((len(vectors), 0), dtype=object)
+        snapshot = self.snapshot
+        if snapshot.nn_model is not None:
+            # Ask for extra neighbours so tombstoned rows can be dropped
+            k_base = min(k_neighbors + len(self.tombstones), snapshot.size)
+            distances, indices = snapshot.nn_model.kneighbors(
+                vectors, n_neighbors=k_base
+            )
+            if self.tombstones:
+                dead = np.fromiter(self.tombstones, dtype=np.int64)
+                distances = np.where(np.isin(indices, dead), np.inf, distances)
+            track_ids = snapshot.track_ids[indices]
+
+        if self.delta_ids:
+            delta_distances = np.linalg.norm(
+                vectors[:, None, :] - self.delta_scaled[None, :, :], axis=2
+            )
+            distances = np.hstack([distances, delta_distances])
+            delta_track_ids = np.array(self.delta_ids, dtype=object)
+            track_ids = np.hstack(
+                [track_ids, np.broadcast_to(delta_track_ids, delta_distances.shape)]
+            )
+
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k_neighbors]
+        return np.take_along_axis(track_ids, order, axis=1).tolist()
+
+    def query_weighted(
+        self, vectors: np.ndarray, weights: np.ndarray, n_songs: int
+    ) -> list[list[str]]:
+        """Like `query`, with each feature's squared distance scaled by `weights`.
+
+        Features with a zero weight are left out of the search, so a query
+        over a few features only reads those rows of `scaled_columns`. The
+        search is exhaustive; the neighbour backend is fitted on all features.
+        """
+        k_neighbors = min(n_songs, self.size)
+        if k_neighbors <= 0:
+            return [[] for _ in range(len(vectors))]
+
+        snapshot = self.snapshot
+        dead = np.fromiter(self.tombstones, dtype=np.int64)
+        track_id_lists = []
+        for vector, weight in zip(vectors, weights):
+            distances = np.zeros(snapshot.size + len(self.delta_ids), dtype=np.float32)
+            for feature in np.flatnonzero(weight):
+                diff = snapshot.scaled_columns[feature] - np.float32(vector[feature])
+                diff *= diff
+                diff *= weight[feature]
+                distances[: snapshot.size] += diff
+                if self.delta_ids:
+                    delta_diff = self.delta_scaled[:, feature] - vector[feature]
+                    distances[snapshot.size :] += weight[feature] * delta_diff**2
+            distances[dead] = np.inf
+
+            rows = np.argpartition(distances, k_neighbors - 1)[:k_neighbors]
+            rows = rows[np.argsort(distances[rows], kind="stable")]
+            track_id_lists.append(
+                [
+                    str(snapshot.track_ids[row])
+                    if row < snapshot.size
+                    else self.delta_ids[row - snapshot.size]
+                    for row in rows
+                ]
+            )
+        return track_id_lists
+
+
+class RecommendationIndex:
+    """Process-wide nearest-neighbour index over the song audio features.
+
+    The scaler and the neighbour backend are fitted once (at startup or on first use) and
+    then shared by every request, which only has to scale its query vector and
+    run a kNN lookup. Song writes are applied incrementally and folded into a
+    freshly fitted snapshot by a background compaction.
+
+    With an `IndexStore`, the worker process that builds first publishes the
+    fitted snapshot as a generation of the store and the others map it
+    instead of fitting their own; every worker maps the newest generation
+    once `refresh` sees it. A build maps the current generation without
+    reading the songs when it was fitted on the same catalogue (by
+    `SongRepository.feature_fingerprint`) with the same settings; otherwise
+    it refits, or raises when `rebuild_on_mismatch` is off. Compactions
+    record the fingerprint read from `fingerprint_source` when it agrees
+    with the compacted rows, so a restart maps their generations too.
+    """
+
+    def __init__(
+        self,
+        feature_store: FeatureStore | None = None,
+        index_store: IndexStore | None = None,
+        rebuild_on_mismatch: bool = True,
+        fingerprint_source: Callable[[], Awaitable[list]] | None = None,
+    ):
+        self._feature_store = feature_store
+        self._index_store = index_store
+        self._rebuild_on_mismatch = rebuild_on_mismatch
+        self._fingerprint_source = fingerprint_source
+        # Generation of `index_store` the snapshot is mapped from
+        self._generation: int | None = None
+        self._state: IndexState | None = None
+        self._build_lock = asyncio.Lock()
+        # Writes received while a rebuild is running, replayed on top of it
+        self._replay_log: list[tuple[str, np.ndarray | None]] | None = None
+        self._compaction_task: asyncio.Task | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._state is not None
+
+    @property
+    def size(self) -> int:
+        return self._state.size if self._state else 0
+
+    @property
+    def version(self) -> int:
+        return self._state.version if self._state else 0
+
+    @property
+    def state(self) -> IndexState | None:
+        """The current state; a query that reads it once sees one consistent index."""
+        return self._state
+
+    @property
+    def generation(self) -> int | None:
+        return self._generation
+
+    async def build(self, song_repository: SongRepository) -> None:
+        async with self._build_lock:
+            await self._build(song_repository)
+
+    async def ensure_built(self, song_repository: SongRepository) -> None:
+        if self.is_ready:
+            return
+        async with self._build_lock:
+            if not self.is_ready:
+                await self._build(song_repository)
+
+    async def _build(self, song_repository: SongRepository) -> None:
+        self._replay_log = []
+        try:
+            fingerprint = None
+            if self._index_store is not None:
+                fingerprint = await song_repository.feature_fingerprint(FEATURES)
+                published = await asyncio.to_thread(
+                    self._map_published, fingerprint_digest(fingerprint)
+                )
+                if published is not None:
+                    self._swap(*published)
+                    return
+                if not self._rebuild_on_mismatch:
+                    raise RuntimeError(
+                        "No published recommendation index matches the catalogue; "
+                        "run `python -m src.utils.index_builder`"
+                    )
+            track_ids, raw_features = await self._load_features(song_repository)
+            self._swap(*await self._snapshot(track_ids, raw_features, fingerprint))
+        finally:
+            self._replay_log = None
+
+    async def compact(self) -> None:
+        """Refit the scaler and neighbour backend over the live rows, dropping the delta."""
+        async with self._build_lock:
+            state = self._state
+            if state is None or state.pending_changes == 0:
+                return
+            self._replay_log = []
+            try:
+                fingerprint = await self._read_fingerprint()
+                track_ids, raw_features = state.live_rows()
+                self._swap(
+                    *await self._snapshot(
+                        track_ids,
+                        raw_features,
+                        fingerprint,
+                        writes=state.pending_writes(),
+                    )
+                )
+            finally:
+                self._replay_log = None
+
+    async def _read_fingerprint(self) -> list | None:
+        if self._index_store is None or self._fingerprint_source is None:
+            return None
+        try:
+            return await self._fingerprint_source()
+        except Exception as e:
+            print(f"Not recording the catalogue fingerprint of the compaction: {e}")
+            return None
+
+    async def refresh(self) -> bool:
+        """Map the store's current generation if another worker published a newer one.
+
+        Writes this worker applied on top of its snapshot are applied again
+        on top of the new one.
+        """
+        if self._index_store is None or self._state is None:
+            return False
+        generation = await asyncio.to_thread(self._index_store.current_generation)
+        if generation is None or generation <= (self._generation or 0):
+            return False
+        async with self._build_lock:
+            newer = await asyncio.to_thread(self._map_newer)
+            if newer is None:
+                return False
+            assert self._state is not None
+            self._swap(*newer, self._state.pending_writes())
+        return True
+
+    def _map_newer(self) -> tuple[IndexSnapshot, int] | None:
+        """Map the store's current generation if it is newer than this worker's."""
+        assert self._index_store is not None
+        with self._index_store.lock(shared=True):
+            generation = self._index_store.current_generation()
+            if generation is None or generation <= (self._generation or 0):
+                return None
+            return self._load_generation(generation), generation
+
+    async def run_refresh_loop(self, interval: float) -> None:
+        if self._index_store is None:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error mapping the shared recommendation index: {e}")
+
+    async def run_compaction_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                print(f"Error compacting recommendation index: {e}")
+
+    async def _load_features(
+        self, song_repository: SongRepository
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Read plain columns batch by batch straight into arrays, without
+        # materializing ORM objects.
+        track_id_batches = []
+        feature_batches = []
+        async for rows in song_repository.stream_features(FEATURES):
+            track_id_batches.append(np.array([row[0] for row in rows], dtype=str))
+            feature_batches.append(
+                np.array([row[1:] for row in rows], dtype=FEATURE_DTYPE)
+            )
+        if not track_id_batches:
+            return np.empty(0, dtype=str), _empty_matrix()
+        return np.concatenate(track_id_batches), np.vstack(feature_batches)
+
+    def _map_published(self, fingerprint: str) -> tuple[IndexSnapshot, int] | None:
+        assert self._index_store is not None
+        with self._index_store.lock():
+            generation = self._index_store.current_generation()
+            if generation is None:
+                return None
+            metadata = self._index_store.metadata(generation)
+            if (
+                metadata.get("catalogue_fingerprint") != fingerprint
+                or metadata.get("params") != _build_params()
+            ):
+                return None
+            try:
+                return self._load_generation(generation), generation
+            except ValueError as e:
+                print(f"Not using the published recommendation index: {e}")
+                return None
+
+    async def _snapshot(
+        self,
+        track_ids: np.ndarray,
+        raw_features: np.ndarray,
+        fingerprint: list | None = None,
+        writes: list[tuple[str, np.ndarray | None]] | None = None,
+    ) -> tuple[IndexSnapshot, int | None]:
+        """A snapshot fitted on these rows, and the store generation it is mapped from.
+
+        `writes` are the ones a compaction folds into the rows, passed so they
+        can be applied to a newer generation instead.
+        """
+        if self._index_store is not None:
+            return await asyncio.to_thread(
+                self._publish, track_ids, raw_features, fingerprint, writes
+            )
+        if self._feature_store is not None:
+            track_ids, raw_features = await asyncio.to_thread(
+                self._share, track_ids, raw_features
+            )
+        return await asyncio.to_thread(self._fit, track_ids, raw_features), None
+
+    def _publish(
+        self,
+        track_ids: np.ndarray,
+        raw_features: np.ndarray,
+        fingerprint: list | None,
+        writes: list[tuple[str, np.ndarray | None]] | None = None,
+    ) -> tuple[IndexSnapshot, int]:
+        """Fit and publish a generation, unless the current one has the same rows.
+
+        The store lock makes concurrently starting workers wait for the first
+        one's generation instead of all fitting the same catalogue.
+        `fingerprint` is recorded when it agrees with the rows, so the next
+        start can map the generation without reading the songs; a write the
+        rows miss, committed while they were read, leaves it unrecorded.
+
+        A compaction passes its `writes`: when another worker published a
+        generation after this one's snapshot was mapped, the rows are rebuilt
+        from that generation plus `writes`, so the other worker's writes are
+        not lost.
+        """
+        assert self._index_store is not None
+        store = self._index_store
+        with store.lock():
+            generation = store.current_generation()
+            if (
+                writes is not None
+                and generation is not None
+                and generation > (self._generation or 0)
+            ):
+                newer = IndexState(snapshot=self._load_generation(generation))
+                track_ids, raw_features = newer.with_writes(writes).live_rows()
+            digest = catalogue_digest(track_ids, raw_features)
+            if fingerprint is not None and _rows_match_fingerprint(
+                fingerprint, track_ids, raw_features
+            ):
+                catalogue_fingerprint = fingerprint_digest(fingerprint)
+            else:
+                catalogue_fingerprint = None
+            metadata = store.metadata(generation) if generation is not None else {}
+            if (
+                generation is not None
+                and metadata.get("catalogue_digest") == digest
+                and metadata.get("params") == _build_params()
+            ):
+                try:
+                    snapshot = self._load_generation(generation)
+                except ValueError as e:
+                    print(f"Refitting the published recommendation index: {e}")
+                else:
+                    if (
+                        catalogue_fingerprint
+                        and metadata.get("catalogue_fingerprint")
+                        != catalogue_fingerprint
+                    ):
+                        store.update_metadata(
+                            generation, catalogue_fingerprint=catalogue_fingerprint
+                        )
+                    return snapshot, generation
+
+            snapshot = self._fit(track_ids, raw_features)
+            sorted_order = np.argsort(snapshot.track_ids, kind="stable")
+            track_ids = np.asarray(snapshot.track_ids, dtype=str)
+            bundle = {
+                "track_ids": track_ids,
+                "sorted_track_ids": track_ids[sorted_order],
+                "sorted_order": sorted_order,
+                "raw_features": np.asarray(raw_features, dtype=FEATURE_DTYPE),
+                "scaled_features": snapshot.scaled_features,
+                "scaled_columns": snapshot.scaled_columns,
+                "scaler": snapshot.scaler,
+                "nn_model": snapshot.nn_model,
+            }
+            generation = store.publish(
+                bundle,
+                {
+                    "songs": snapshot.size,
+                    "catalogue_digest": digest,
+                    "catalogue_fingerprint": catalogue_fingerprint,
+                    "params": _build_params(),
+                },
+            )
+        # Map the published arrays even in the publishing worker, so the
+        # fitted copies are freed
+        with store.lock(shared=True):
+            return self._load_generation(generation), generation
+
+    def _load_generation(self, generation: int) -> IndexSnapshot:
+        assert self._index_store is not None
+        bundle = self._index_store.load(generation)
+        return IndexSnapshot(
+            bundle["track_ids"],
+            SortedTrackIds(bundle["sorted_track_ids"], bundle["sorted_order"]),
+            bundle["raw_features"],
+            bundle["scaled_features"],
+            bundle["scaler"],
+            bundle["nn_model"],
+            bundle["scaled_columns"],
+        )
+
+    def _share(
+        self, track_ids: np.ndarray, raw_features: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Swap the arrays for read-only maps of the on-disk feature store.
+
+        The store is only rewritten when its content differs, so workers that
+        start from the same catalogue map the same files. The arrays mapped
+        are always the ones written or compared here, even when another
+        worker writes a different snapshot meanwhile. Only the raw rows are
+        mapped; `_fit` still builds the scaled matrices and the backend in
+        every worker.
+        """
+        assert self._feature_store is not None
+        try:
+            stored_track_ids, stored_features = self._feature_store.load()
+        except ValueError:
+            pass
+        else:
+            if np.array_equal(stored_track_ids, track_ids) and np.array_equal(
+                stored_features, raw_features
+            ):
+                return stored_track_ids, stored_features
+        return self._feature_store.write(track_ids, raw_features)
+
+    def _swap(
+        self,
+        snapshot: IndexSnapshot,
+        generation: int | None = None,
+        writes: list[tuple[str, np.ndarray | None]] | None = None,
+    ) -> None:
+        version = self._state.version + 1 if self._state else 0
+        state = IndexState(snapshot=snapshot, version=version)
+        self._generation = generation
+        self._state = state.with_writes([*(writes or []), *(self._replay_log or [])])
+
+    def _fit(self, track_ids: np.ndarray, raw_features: np.ndarray) -> IndexSnapshot:
+        positions = pd.Index(track_ids.tolist())
+        if len(track_ids) == 0:
+            return IndexSnapshot(
+                track_ids,
+                positions,
+                raw_features,
+                raw_features,
+                None,
+                None,
+                raw_features.T,
+            )
+
+        scaler = MinMaxScaler()
+        scaled = scaler.fit_transform(raw_features).astype(FEATURE_DTYPE)
+        nn_model = create_backend(len(track_ids)).fit(scaled)
+        return IndexSnapshot(
+            track_ids,
+            positions,
+            raw_features,
+            scaled,
+            scaler,
+            nn_model,
+            np.ascontiguousarray(scaled.T),
+        )
+
+    def _apply(self, track_id: str, raw_vector: np.ndarray | None) -> None:
+        if self._replay_log is not None:
+            self._replay_log.append((track_id, raw_vector))
+        state = self._state
+        if state is None:
+            # Not built yet: the build will read this write from the database
+            return
+
+        if raw_vector is None:
+            self._state = state.remove(track_id)
+        else:
+            self._state = state.upsert(track_id, raw_vector)
+
+        if (
+            self._state.pending_changes >= settings.RECOMMENDER_COMPACTION_THRESHOLD
+            or self._state.snapshot.scaler is None
+        ):
+            self._schedule_compaction()
+
+    def _schedule_compaction(self) -> None:
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.create_task(self.compact())
+
+    def upsert_song(self, song) -> None:
+        raw_vector = np.array(
+            [getattr(song, f) for f in FEATURES], dtype=FEATURE_DTYPE
+        )
+        self._apply(song.track_id, raw_vector)
+
+    def remove_song(self, track_id: str) -> None:
+        self._apply(track_id, None)
+
+    def seed_vectors(
+        self, song_id_lists: list[list[str]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self._state is None:
+            return _empty_matrix(), np.zeros(len(song_id_lists), dtype=bool)
+        return self._state.seed_vectors(song_id_lists)
+
+    def transform(self, raw_vectors: np.ndarray) -> np.ndarray:
+        if self._state is None:
+            return raw_vectors
+        return self._state.snapshot.transform(raw_vectors)
+
+    def query(self, vectors: np.ndarray, n_songs: int) -> list[list[str]]:
+        """Track ids of the `n_songs` nearest songs to each (scaled) vector."""
+        if self._state is None:
+            return [[] for _ in range(len(vectors))]
+        return self._state.query(vectors, n_songs)
+
+    def query_weighted(
+        self, vectors: np.ndarray, weights: np.ndarray, n_songs: int
+    ) -> list[list[str]]:
+        """Like `query`, over the features each row of `weights` gives a weight to."""
+        if self._state is None:
+            return [[] for _ in range(len(vectors))]
+        return self._state.query_weighted(vectors, weights, n_songs)
+
+
+async def _database_fingerprint() -> list:
+    async with AsyncSessionLocal() as session:
+        return await SongRepository(session).feature_fingerprint(FEATURES)
+
+
+recommendation_index = RecommendationIndex(
+    FeatureStore(settings.FEATURE_STORE_DIR) if settings.FEATURE_STORE_DIR else None,
+    IndexStore(settings.SHARED_INDEX_DIR) if settings.SHARED_INDEX_DIR else None,
+    rebuild_on_mismatch=settings.SHARED_INDEX_ON_MISMATCH == "rebuild",
+    fingerprint_source=_database_fingerprint,
+)
@@ -1,221 +1,172 @@
-import pandas as pd
-from sklearn.neighbors import NearestNeighbors  # type: ignore
-from sklearn.preprocessing import MinMaxScaler  # type: ignore
+import numpy as np
+from pydantic import TypeAdapter
 
+from src.core.config import settings
 from src.domain.schemas.song import SongFeatures, SongResponse
 from src.repositories.song_repository import SongRepository
+from src.services.recommendation_cache import RecommendationCache
+from src.services.recommendation_index import (
+    FEATURES,
+    IndexState,
+    RecommendationIndex,
+)
+from src.utils.concurrency import ComputePool
 
+_SONG_RESPONSES = TypeAdapter(list[SongResponse])
 
-class RecommenderService:
-    _FEATURES = [
-        "danceability",
-        "energy",
-        "key",
-        "loudness",
-        "speechiness",
-        "acousticness",
-        "instrumentalness",
-        "liveness",
-        "valence",
-        "tempo",
-    ]
-
-    def __init__(self, song_repository: SongRepository):
-        self._song_repository = song_repository
-
-    def _songs_to_dataframe(self, all_songs_models) -> tuple[pd.DataFrame, dict]:
-        list_of_songs = [
-            {
-                "track_id": s.track_id,
-                "danceability": s.danceability,
-                "energy": s.energy,
-                "key": s.key,
-                "loudness": s.loudness,
-                "mode": s.mode,
-                "speechiness": s.speechiness,
-                "acousticness": s.acousticness,
-                "instrumentalness": s.instrumentalness,
-                "liveness": s.liveness,
-                "valence": s.valence,
-                "tempo": s.tempo,
-                "duration_ms": s.duration_ms,
-            }
-            for s in all_songs_models
-        ]
-
-        songs_map = {s.track_id: s for s in all_songs_models}
-        df_songs = pd.DataFrame(list_of_songs)
-        return df_songs, songs_map
 
-    def _build_nn_model(
-        self,
-        df_songs: pd.DataFrame,
-        n_songs: int,
-    ) -> tuple[MinMaxScaler, NearestNeighbors, int]:
-        scaler = MinMaxScaler()
-        df_songs[self._FEATURES] = scaler.fit_transform(df_songs[self._FEATURES])
-
-        k_neighbors = n_songs
-        if k_neighbors > len(df_songs):
-            k_neighbors = len(df_songs)
-        if k_neighbors <= 0:
-            k_neighbors = 0
-
-        nn_model = NearestNeighbors(
-            n_neighbors=max(k_neighbors, 1), algorithm="ball_tree"
-        )
-        nn_model.fit(df_songs[self._FEATURES])
-        return scaler, nn_model, k_neighbors
+class RecommenderService:
+    _FEATURES = FEATURES
 
-    def _responses_from_neighbor_indices(
+    def __init__(
         self,
-        df_songs: pd.DataFrame,
-        songs_map: dict,
-        neighbor_indices,
-        n_songs: int,
+        song_repository: SongRepository,
+        index: RecommendationIndex,
+        cache: RecommendationCache | None = None,
+        pool: ComputePool | None = None,
+    ):
+        self._song_repository = song_repository
+        self._index = index
+        self._cache = cache
+        # kNN queries run on the event loop without a pool (scripts)
+        self._pool = pool
+
+    async def _compute(self, func, *args):
+        if self._pool is None:
+            return func(*args)
+        return await self._pool.run(func, *args)
+
+    async def _responses_from_track_ids(
+        self, track_ids: list[str]
     ) -> list[SongResponse]:
-        recommended_songs: list[SongResponse] = []
-        for idx in neighbor_indices:
-            track_id = df_songs.iloc[idx]["track_id"]
-            original_song = songs_map.get(track_id)
-            if original_song:
-                recommended_songs.append(SongResponse.model_validate(original_song))
-        return recommended_songs[:n_songs]
-
-    def _song_to_raw_feature_row(self, song_model) -> list:
-        data = {
-            "danceability": song_model.danceability,
-            "energy": song_model.energy,
-            "key": song_model.key,
-            "loudness": song_model.loudness,
-            "speechiness": song_model.speechiness,
-            "acousticness": song_model.acousticness,
-            "instrumentalness": song_model.instrumentalness,
-            "liveness": song_model.liveness,
-            "valence": song_model.valence,
-            "tempo": song_model.tempo,
-        }
-        return [data[f] for f in self._FEATURES]
+        return (await self._responses_from_track_id_lists([track_ids]))[0]
+
+    async def _responses_from_track_id_lists(
+        self, track_id_lists: list[list[str]]
+    ) -> list[list[SongResponse]]:
+        # One query and one validation call for every song in the batch
+        unique_ids = list({t for track_ids in track_id_lists for t in track_ids})
+        songs = await self._song_repository.get_by_ids(unique_ids)
+        validated = _SONG_RESPONSES.validate_python(songs, from_attributes=True)
+        responses = {song.track_id: song for song in validated}
+        return [
+            [responses[t] for t in track_ids if t in responses]
+            for track_ids in track_id_lists
+        ]
 
     def _song_features_to_row(self, song_features: SongFeatures) -> list:
+        # Missing features become NaN, which the scaler passes through
         return [getattr(song_features, f) for f in self._FEATURES]
 
-    def _song_features_has_all_required(self, song_features: SongFeatures) -> bool:
-        return all(getattr(song_features, f) is not None for f in self._FEATURES)
+    @staticmethod
+    def _query(
+        state: IndexState, query_normalized: np.ndarray, n_songs: int
+    ) -> list[str]:
+        """Nearest songs over the features the (scaled) query has."""
+        populated = ~np.isnan(query_normalized[0])
+        if populated.all():
+            return state.query(query_normalized, n_songs)[0]
+        return state.query_weighted(
+            np.nan_to_num(query_normalized), populated[None, :], n_songs
+        )[0]
 
     async def recommend_from_features(
         self,
         features_json: SongFeatures | dict,
         n_songs: int,
     ) -> list[SongResponse]:
-        all_songs_models = await self._song_repository.get_all(limit=100000)
-        if not all_songs_models:
-            return []
-
-        df_songs, songs_map = self._songs_to_dataframe(all_songs_models)
-
         song_features = (
             features_json
             if isinstance(features_json, SongFeatures)
             else SongFeatures.model_validate(features_json)
         )
-        if not self._song_features_has_all_required(song_features):
+        row = np.array([self._song_features_to_row(song_features)], dtype=np.float64)
+        if np.isnan(row).all():
             return []
 
-        scaler, nn_model, k_neighbors = self._build_nn_model(df_songs, n_songs)
-        if k_neighbors <= 0:
+        await self._index.ensure_built(self._song_repository)
+        # Scaled and queried against the same state, even if a compaction or
+        # a refresh swaps the index meanwhile
+        state = self._index.state
+        if state is None:
             return []
-
-        query_row = pd.DataFrame(
-            [self._song_features_to_row(song_features)], columns=self._FEATURES
-        )
-        query_normalized = scaler.transform(query_row)
-        distances, indices = nn_model.kneighbors(query_normalized)
-
-        neighbor_indices = indices[0]
-        return self._responses_from_neighbor_indices(
-            df_songs=df_songs,
-            songs_map=songs_map,
-            neighbor_indices=neighbor_indices,
-            n_songs=n_songs,
-        )
+        query_normalized = state.snapshot.transform(row)
+        if self._cache is None:
+            track_ids = await self._compute(
+                self._query, state, query_normalized, n_songs
+            )
+            return await self._responses_from_track_ids(track_ids)
+
+        # Results are cached under the version of the state that computed them
+        key = self._cache.vector_key(query_normalized[0], n_songs)
+        track_ids = self._cache.get(key, state.version)
+        if track_ids is None:
+            track_ids = await self._compute(
+                self._query, state, query_normalized, n_songs
+            )
+            self._cache.put(key, state.version, track_ids)
+        return await self._responses_from_track_ids(track_ids)
 
     async def recommend(self, song_ids: list[str], n_songs: int) -> list[SongResponse]:
-        # Fetch all songs to build the model.
-        # Note: In a production system, we would cache the model or train it offline.
-        # For this exercise, we build it on the fly as requested.
-        all_songs_models = await self._song_repository.get_all(
-            limit=100000
-        )  # Assuming < 100k songs
-        if not all_songs_models:
-            return []
-
-        df_songs, songs_map = self._songs_to_dataframe(all_songs_models)
-        scaler, nn_model, k_neighbors = self._build_nn_model(df_songs, n_songs)
-        # Ensure k_neighbors <= number of samples
-        if k_neighbors <= 0:
-            return []
-
-        features = self._FEATURES
-
-        list_values = []
-        for song_id in song_ids:
-            if song_id not in songs_map:
-                continue
-
-            # Find the row in df_songs for this song_id
-            # Or just extract from map and normalize using the same scaler?
-            # Easiest is to pick from df_songs
-
-            song_row = df_songs[df_songs["track_id"] == song_id]
-            if song_row.empty:
-                continue
-
-            features_values = song_row[features].values.flatten().tolist()
-            list_values.append(features_values)
-
-        if not list_values:
-            return []
-
-        # reference_songs_normalized = scaler.transform(pd.DataFrame(list_values))
-        # Wait, df_songs is already scaled. So picking from it gives scaled values.
-        # The user snippet did:
-        # chosen_track_id = ...to_dict()
-        # features_values = [chosen_track_id[feature] for feature in features]
-        # list_values.append(features_values)
-        # reference_songs_normalized = scaler.transform(pd.DataFrame(list_values))
-        #
-        # This implies user snippet picked RAW values then transformed.
-        # My approach picked SCALED values from df_songs.
-
-        # Let's stick to the user logic: pick raw, then transform.
-        # So I need raw values map.
-
-        raw_values = []
-        for song_id in song_ids:
-            s = songs_map.get(song_id)
-            if not s:
-                continue
-            # Extract raw features from model
-            raw_values.append(self._song_to_raw_feature_row(s))
-
-        if not raw_values:
+        return (await self.recommend_batch([(song_ids, n_songs)]))[0]
+
+    async def recommend_batch(
+        self, queries: list[tuple[list[str], int]]
+    ) -> list[list[SongResponse]]:
+        """Answer many seed-based queries with a single kNN call.
+
+        Results are returned in the order of `queries`; a query without any
+        known seed song gets an empty list.
+        """
+        await self._index.ensure_built(self._song_repository)
+        state = self._index.state
+        if state is None:
+            return [[] for _ in queries]
+        if self._cache is None:
+            return await self._responses_from_track_id_lists(
+                await self._compute(self._query_batch, state, queries)
+            )
+
+        # Only the queries missing from the cache go to the index, and results
+        # are cached under the version of the state that computed them
+        version = state.version
+        keys = [self._cache.seed_key(song_ids, n) for song_ids, n in queries]
+        cached = [self._cache.get(key, version) for key in keys]
+        misses = [i for i, track_ids in enumerate(cached) if track_ids is None]
+        computed = await self._compute(
+            self._query_batch, state, [queries[i] for i in misses]
+        )
+        for i, track_ids in zip(misses, computed):
+            cached[i] = track_ids
+            self._cache.put(keys[i], version, track_ids)
+        return await self._responses_from_track_id_lists(cached)
+
+    @staticmethod
+    def _query_batch(
+        state: IndexState, queries: list[tuple[list[str], int]]
+    ) -> list[list[str]]:
+        # Runs in the compute pool. Seeds and neighbours both come from
+        # `state`, which is immutable, whatever the index swaps to meanwhile.
+        if not queries:
             return []
-
-        reference_songs_normalized = scaler.transform(
-            pd.DataFrame(raw_values, columns=self._FEATURES)
+        # Mean scaled vector of every query's seed songs, in one pass
+        vectors, has_seeds = state.seed_vectors(
+            [song_ids for song_ids, _ in queries]
         )
-        combined_features = reference_songs_normalized.mean(axis=0).tolist()
+        limits = np.array([n_songs for _, n_songs in queries], dtype=np.int64)
+        active = has_seeds & (limits > 0)
+        vectors = vectors[active[has_seeds]]
 
-        distances, indices = nn_model.kneighbors([combined_features])
+        track_id_lists: list[list[str]] = [[] for _ in queries]
+        if len(vectors):
+            positions = np.flatnonzero(active)
+            neighbors = state.query(vectors, int(limits[positions].max()))
+            for position, track_ids in zip(positions, neighbors):
+                track_id_lists[position] = track_ids[: limits[position]]
 
-        # Indices is list of lists [[idx1, idx2...]]
-        neighbor_indices = indices[0]
+        return track_id_lists
 
-        # Limit to n_songs just in case
-        return self._responses_from_neighbor_indices(
-            df_songs=df_songs,
-            songs_map=songs_map,
-            neighbor_indices=neighbor_indices,
-            n_songs=n_songs,
-        )
+
+recommender_pool = ComputePool(
+    settings.RECOMMENDER_POOL_WORKERS, settings.RECOMMENDER_POOL_MAX_QUEUED
+)
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+
+from sqlalchemy import Float, Integer
+from src.domain.models.song import SongModel
+
+try:
+    import pyarrow as pa  # type: ignore
+except ImportError:  # Arrow exports are optional
+    pa = None
+
+COLUMNS = [c.name for c in SongModel.__table__.columns]
+
+
+class NDJSONEncoder:
+    media_type = "application/x-ndjson"
+
+    def encode(self, rows: list[dict]) -> bytes:
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CSVEncoder:
+    media_type = "text/csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(
+            self._buffer, fieldnames=COLUMNS, extrasaction="ignore"
+        )
+        self._writer.writeheader()
+
+    def encode(self, rows: list[dict]) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        # The header alone when there are no songs
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+class ArrowEncoder:
+    """Arrow IPC stream: a schema message followed by one record batch per chunk."""
+
+    media_type = "application/vnd.apache.arrow.stream"
+
+    def __init__(self):
+        if pa is None:
+            raise ValueError("Arrow export requires pyarrow to be installed")
+        self._schema = pa.schema(
+            [(c.name, self._arrow_type(c.type)) for c in SongModel.__table__.columns]
+        )
+        self._buffer = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._buffer, self._schema)
+
+    @staticmethod
+    def _arrow_type(column_type):
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Float):
+            return pa.float64()
+        return pa.string()
+
+    def encode(self, rows: list[dict]) -> bytes:
+        self._writer.write_batch(pa.RecordBatch.from_pylist(rows, self._schema))
+        return self._drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+ENCODERS = {"ndjson": NDJSONEncoder, "csv": CSVEncoder, "arrow": ArrowEncoder}
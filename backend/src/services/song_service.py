@@ -1,15 +1,26 @@
+from typing import AsyncIterator
+
+from pydantic import TypeAdapter
+
+from src.core.config import settings
 from src.domain.models.song import SongModel
 from src.domain.schemas.song import SongCreate, SongResponse, SongUpdate
 from src.repositories.song_repository import SongRepository
+from src.services.recommendation_index import RecommendationIndex
+from src.services.song_export import ENCODERS
+
+_SONG_RESPONSES = TypeAdapter(list[SongResponse])
 
 
 class SongService:
-    def __init__(self, repo: SongRepository):
+    def __init__(self, repo: SongRepository, index: RecommendationIndex):
         self.repo = repo
+        self.index = index
 
     async def create_song(self, song_in: SongCreate) -> SongResponse:
         song = SongModel(**song_in.model_dump())
         created = await self.repo.create(song)
+        self.index.upsert_song(created)
         return SongResponse.model_validate(created)
 
     async def get_songs(
@@ -18,6 +29,38 @@ class SongService:
         songs = await self.repo.get_all(limit, offset, search)
         return [SongResponse.model_validate(s) for s in songs]
 
+    async def get_songs_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        search: str | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[SongResponse], str | None]:
+        songs, next_cursor = await self.repo.get_page(limit, offset, search, cursor)
+        return [SongResponse.model_validate(s) for s in songs], next_cursor
+
+    def export_songs(
+        self, export_format: str, validate: bool = False
+    ) -> tuple[str, AsyncIterator[bytes]]:
+        """The media type and encoded chunks of a full catalogue export.
+
+        Rows go straight from the database cursor to the encoder, one batch
+        at a time; `validate` round-trips them through `SongResponse` first.
+        Raises ValueError if the format is not available.
+        """
+        encoder = ENCODERS[export_format]()
+        return encoder.media_type, self._export_chunks(encoder, validate)
+
+    async def _export_chunks(self, encoder, validate: bool) -> AsyncIterator[bytes]:
+        async for rows in self.repo.stream_songs(settings.EXPORT_BATCH_SIZE):
+            records = [row._asdict() for row in rows]
+            if validate:
+                records = _SONG_RESPONSES.dump_python(
+                    _SONG_RESPONSES.validate_python(records), mode="json"
+                )
+            yield encoder.encode(records)
+        yield encoder.finish()
+
     async def get_song_by_id(self, track_id: str) -> SongResponse | None:
         song = await self.repo.get_by_id(track_id)
         if song:
@@ -30,8 +73,12 @@ class SongService:
         song_data = song_in.model_dump(exclude_unset=True)
         updated = await self.repo.update(track_id, song_data)
         if updated:
+            self.index.upsert_song(updated)
             return SongResponse.model_validate(updated)
         return None
 
     async def delete_song(self, track_id: str) -> bool:
-        return await self.repo.delete(track_id)
+        deleted = await self.repo.delete(track_id)
+        if deleted:
+            self.index.remove_song(track_id)
+        return deleted
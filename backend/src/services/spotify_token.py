@@ -0,0 +1,64 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+from src.core.config import settings
+from src.repositories.spotify_repository import SpotifyRepository
+from src.utils.concurrency import SingleFlight
+
+
+class SpotifyTokenManager:
+    """Caches the Spotify client-credentials token for the whole app.
+
+    A cached token is served until it expires. Within `refresh_margin`
+    seconds of expiry it is still served while a new one is fetched in the
+    background, so requests only wait for Spotify when there is no usable
+    token at all. Concurrent refreshes share a single token request.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_margin = (
+            settings.SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS
+            if refresh_margin is None
+            else refresh_margin
+        )
+        self._clock = clock
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._refresh = SingleFlight()
+
+    async def get_token(self, spotify_repo: SpotifyRepository) -> str:
+        now = self._clock()
+        if self._token is not None and now < self._expires_at:
+            if now >= self._expires_at - self.refresh_margin:
+                self._refresh_in_background(spotify_repo)
+            return self._token
+        return await self._refresh.do("token", lambda: self._fetch(spotify_repo))
+
+    def invalidate(self) -> None:
+        """Forget the cached token, e.g. after Spotify rejected it."""
+        self._token = None
+
+    async def _fetch(self, spotify_repo: SpotifyRepository) -> str:
+        requested_at = self._clock()
+        token, expires_in = await spotify_repo.fetch_token()
+        self._token = token
+        self._expires_at = requested_at + expires_in
+        return token
+
+    def _refresh_in_background(self, spotify_repo: SpotifyRepository) -> None:
+        if not self._refresh.in_flight("token"):
+            future = self._refresh.start("token", lambda: self._fetch(spotify_repo))
+            future.add_done_callback(_report_refresh_error)
+
+
+def _report_refresh_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Error refreshing Spotify token: {future.exception()}")
+
+
+spotify_token_manager = SpotifyTokenManager()
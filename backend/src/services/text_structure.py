@@ -1,18 +1,52 @@
+import time
+
 from src.agents.song_feature_agent import SongFeaturesAgent
-from src.domain.schemas.song import SongResponse
+from src.domain.schemas.song import SongFeatures, SongResponse
+from src.repositories.prompt_features_repository import PromptFeaturesRepository
+from src.services.prompt_cache import CachedFeatures, PromptCache, normalize_prompt
 from src.services.recommender_service import RecommenderService
 
 
 class TextStructureService:
     def __init__(
-        self, agent: SongFeaturesAgent, recommender_service: RecommenderService
+        self,
+        agent: SongFeaturesAgent,
+        recommender_service: RecommenderService,
+        prompt_features_repo: PromptFeaturesRepository,
+        prompt_cache: PromptCache,
     ):
         self.agent = agent
         self.recommender_service = recommender_service
+        self.prompt_features_repo = prompt_features_repo
+        self.prompt_cache = prompt_cache
 
     async def text_structure(self, text: str, limit: int) -> list[SongResponse]:
-        text_feature = await self.agent(text)
+        text_feature = await self.extract_features(text)
         songs = await self.recommender_service.recommend_from_features(
             text_feature, limit
         )
         return songs
+
+    async def extract_features(self, text: str) -> SongFeatures:
+        """The agent's features for `text`, served from the cache when possible."""
+        prompt = normalize_prompt(text)
+        if not self.prompt_cache.loaded:
+            await self.prompt_cache.load(self.prompt_features_repo)
+        entry = self.prompt_cache.get(prompt)
+        if entry is None:
+            entry = await self.prompt_cache.get_persisted(
+                self.prompt_features_repo, prompt
+            )
+        # Only once both exact tiers missed
+        if entry is None:
+            entry = self.prompt_cache.get_similar(prompt)
+        if entry is None:
+            entry = await self.prompt_cache.lookup(
+                prompt, lambda: self._ask_agent(text, prompt)
+            )
+        return entry.features
+
+    async def _ask_agent(self, text: str, prompt: str) -> CachedFeatures:
+        entry = CachedFeatures(await self.agent(text), time.time())
+        await self.prompt_cache.save(prompt, entry)
+        return entry
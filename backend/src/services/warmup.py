@@ -0,0 +1,77 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.repositories.song_repository import SongRepository
+from src.services.recommendation_index import RecommendationIndex
+from src.utils.seeder import seed_database
+
+
+@dataclass
+class Warmup:
+    """Progress of the seeding and index build that run after startup.
+
+    The phase goes "idle" -> "seeding" -> "indexing" -> "ready" (or
+    "failed"). "idle" means no warm-up was started, e.g. in scripts and tests,
+    where the index is built on first use instead.
+    """
+
+    phase: str = "idle"
+    songs_loaded: int = 0
+    seed_progress: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self.phase in ("seeding", "indexing")
+
+    def start(self) -> None:
+        self.phase = "seeding"
+        self.started_at = time.time()
+
+    def report_seeding(self, songs_loaded: int, fraction: float) -> None:
+        self.songs_loaded = songs_loaded
+        self.seed_progress = fraction
+
+    def status(self) -> dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "phase": self.phase,
+            "songs_loaded": self.songs_loaded,
+            "seed_progress": round(self.seed_progress, 3),
+            "elapsed_seconds": None if elapsed is None else round(elapsed, 1),
+            "error": self.error,
+        }
+
+    async def run(
+        self,
+        index: RecommendationIndex,
+        session_factory: async_sessionmaker[AsyncSession],
+        csv_path: str = "src/resources/spotify_songs.csv",
+    ) -> None:
+        """Seed the database if it is empty, then build the recommendation index."""
+        if self.phase == "idle":
+            self.start()
+        try:
+            await seed_database(
+                csv_path, session_factory, progress=self.report_seeding
+            )
+            self.phase = "indexing"
+            async with session_factory() as session:
+                await index.build(SongRepository(session))
+            print(f"Recommendation index built with {index.size} songs.")
+            self.phase = "ready"
+        except Exception as e:
+            self.phase = "failed"
+            self.error = str(e)
+            print(f"Error warming up: {e}")
+        finally:
+            self.finished_at = time.time()
+
+
+warmup = Warmup()
@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheEntry(Generic[V]):
+    value: V
+    stored_at: float
+    expires_at: float
+
+
+class TTLCache(Generic[V]):
+    """In-process LRU cache whose entries expire after a per-entry TTL.
+
+    Expired entries are dropped when they are read; the least recently used
+    entry is evicted once `maxsize` entries are stored.
+    """
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, CacheEntry[V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Neither counted as a hit or miss nor marked as recently used
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self._clock()
+
+    def get(self, key: Hashable) -> CacheEntry[V] | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Hashable, value: V, ttl: float) -> None:
+        now = self._clock()
+        self._entries[key] = CacheEntry(value, now, now + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call.
+
+    Every caller that asks for a key while its call is running awaits the
+    same result (or exception). A cancelled caller does not cancel the call
+    for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def start(
+        self, key: Hashable, call: Callable[[], Awaitable[T]]
+    ) -> asyncio.Future:
+        """Start (or join) the call for `key` without waiting for it."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return future
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, call))
+
+
+class PoolSaturated(Exception):
+    """Raised by `ComputePool.run` when no more calls may wait for a worker."""
+
+
+class ComputePool:
+    """Runs CPU-bound calls in a thread pool so they do not block the event loop.
+
+    NumPy and scikit-learn release the GIL in their numeric kernels, so
+    `max_workers` calls make progress in parallel while the loop keeps
+    serving other requests. At most `max_queued` more calls wait for a free
+    worker; beyond that `run` raises `PoolSaturated` at once instead of
+    letting latency grow without bound. A call counts against that bound
+    until its worker finishes it, even when the request awaiting it was
+    cancelled first.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor: ThreadPoolExecutor | None = None
+        # Updated from the worker threads as calls finish
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="compute"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queued:
+                self.rejected += 1
+                raise PoolSaturated("Too many requests waiting for a compute worker")
+            self._in_flight += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.repositories.index_store import IndexStore
+from src.repositories.song_repository import SongRepository
+from src.services.recommendation_index import RecommendationIndex
+
+
+async def build_index(
+    directory: str,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> int:
+    """Fit the recommendation index on the songs table and publish it to `directory`.
+
+    Nothing is written when the current generation there already matches
+    the catalogue and the index settings. Returns the current generation.
+    """
+    store = IndexStore(directory)
+    index = RecommendationIndex(index_store=store)
+    start = time.perf_counter()
+    async with session_factory() as session:
+        await index.build(SongRepository(session))
+    assert index.generation is not None
+    metadata = store.metadata(index.generation)
+    print(
+        f"Recommendation index generation {index.generation} in {directory}: "
+        f"{metadata['songs']} songs, bundle sha256 {metadata['bundle_sha256'][:12]}, "
+        f"{time.perf_counter() - start:.1f}s."
+    )
+    return index.generation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fit the recommendation index and publish it for the API to map."
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=settings.SHARED_INDEX_DIR or "./src/core/storage/index",
+    )
+    args = parser.parse_args()
+    asyncio.run(build_index(args.directory))
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """Token-bucket rate limiter for calls to an external API.
+
+    Tokens accrue at `rate` per second up to `capacity`, so up to `capacity`
+    calls may go out in a burst and `rate` per second are sustained. Callers
+    waiting for a token are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # Holding the lock while sleeping keeps later callers queued behind
+        # the one that is waiting for the next token
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
@@ -1,86 +1,176 @@
+import argparse
+import asyncio
 import os
+import time
+from typing import Callable
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import Float, Integer
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from src.core.database import AsyncSessionLocal
 from src.domain.models.song import SongModel
 from src.repositories.song_repository import SongRepository
 
+_COLUMNS = list(SongModel.__table__.columns)
+_NUMERIC_TYPES = (Integer, Float)
 
-async def seed_database():
+
+class SeenTrackIds:
+    """Track ids already loaded, kept as sorted arrays of 64-bit hashes.
+
+    Eight bytes per song instead of a Python set of strings, so deduplicating
+    a catalogue far larger than memory stays cheap. Two distinct ids with the
+    same hash would drop the second song; at 64 bits that is negligible.
+
+    Each chunk's hashes are kept as a sorted run, and a run is merged into
+    the one before it once that one is no more than twice its size. Every
+    hash is merged O(log N) times and a lookup checks O(log N) runs, so a
+    load stays O(N log N) instead of copying the whole array per chunk.
+    """
+
+    def __init__(self):
+        # Sorted runs, from the largest to the smallest
+        self._runs: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def _known(self, hashes: np.ndarray) -> np.ndarray:
+        known = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            known |= run[positions] == hashes
+        return known
+
+    def add(self, track_ids: pd.Series) -> np.ndarray:
+        """Remember `track_ids`; True for the first occurrence of each new id."""
+        hashes = pd.util.hash_array(track_ids.to_numpy(dtype=object))
+        unique, first = np.unique(hashes, return_index=True)
+        known = self._known(unique)
+
+        if not known.all():
+            self._runs.append(unique[~known])
+            while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(
+                self._runs[-1]
+            ):
+                newest = self._runs.pop()
+                self._runs[-1] = np.sort(np.concatenate([self._runs[-1], newest]))
+        is_new = np.zeros(len(hashes), dtype=bool)
+        is_new[first[~known]] = True
+        return is_new
+
+
+def prepare_songs(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a raw CSV frame to `SongModel` columns, one column at a time.
+
+    Rows whose numeric fields cannot be parsed are dropped, and missing
+    optional text becomes None.
+    """
+    songs = pd.DataFrame(index=df.index)
+    for column in _COLUMNS:
+        values = df[column.name]
+        if isinstance(column.type, _NUMERIC_TYPES):
+            songs[column.name] = pd.to_numeric(values, errors="coerce")
+        else:
+            values = values.astype(object).where(values.notna(), None)
+            songs[column.name] = values if column.nullable else values.astype(str)
+
+    numeric = [c.name for c in _COLUMNS if isinstance(c.type, _NUMERIC_TYPES)]
+    invalid = songs[numeric].isna().any(axis=1)
+    if invalid.any():
+        print(f"Skipping {int(invalid.sum())} rows with invalid numeric values")
+        songs = songs[~invalid]
+    for column in _COLUMNS:
+        if isinstance(column.type, Integer):
+            songs[column.name] = songs[column.name].astype("int64")
+    return songs
+
+
+async def load_csv(
+    session: AsyncSession,
+    csv_path: str,
+    chunk_size: int = 50_000,
+    progress: Callable[[int, float], None] | None = None,
+) -> int:
+    """Stream `csv_path` into the database in a single transaction.
+
+    The CSV is parsed `chunk_size` rows at a time and every chunk is inserted
+    before the next one is read, so memory stays flat whatever the file size.
+    Duplicate track ids keep their first occurrence in the file. `progress`
+    is called after every chunk with the songs loaded so far and the
+    fraction of the file read.
+    """
+    repo = SongRepository(session)
+    seen = SeenTrackIds()
+    text_columns = {
+        c.name: str for c in _COLUMNS if not isinstance(c.type, _NUMERIC_TYPES)
+    }
+    file_size = max(os.path.getsize(csv_path), 1)
+    total = 0
+    start = time.perf_counter()
+    with open(csv_path, "rb") as f:
+        reader = pd.read_csv(
+            f,
+            usecols=[c.name for c in _COLUMNS],
+            dtype=text_columns,
+            chunksize=chunk_size,
+        )
+
+        def next_rows() -> list[tuple] | None:
+            chunk = next(reader, None)
+            if chunk is None:
+                return None
+            songs = prepare_songs(chunk[seen.add(chunk["track_id"])])
+            return list(songs.astype(object).itertuples(index=False, name=None))
+
+        # The next chunk is parsed in a thread while the current one is
+        # inserted, so at most two chunks are in memory at a time and the
+        # event loop stays free to serve requests.
+        next_batch = asyncio.ensure_future(asyncio.to_thread(next_rows))
+        try:
+            async with repo.bulk_load():
+                while (rows := await next_batch) is not None:
+                    next_batch = asyncio.ensure_future(asyncio.to_thread(next_rows))
+                    await repo.bulk_insert(rows)
+                    total += len(rows)
+                    rate = total / (time.perf_counter() - start)
+                    print(f"Loaded {total} songs ({rate:,.0f} rows/s)")
+                    if progress:
+                        progress(total, min(f.tell() / file_size, 1.0))
+        finally:
+            # Never close the file under a parse still running in its thread
+            await asyncio.gather(next_batch, return_exceptions=True)
+    return total
+
+
+async def seed_database(
+    csv_path: str = "src/resources/spotify_songs.csv",
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    chunk_size: int = 50_000,
+    progress: Callable[[int, float], None] | None = None,
+):
     """Checks if the database is empty and seeds it from the Spotify CSV file."""
     print("Checking database...")
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         repo = SongRepository(session)
         try:
             existing_songs = await repo.get_all(limit=1)
             if not existing_songs:
-                csv_path = "src/resources/spotify_songs.csv"
                 if not os.path.exists(csv_path):
                     print(f"CSV file not found at {csv_path}")
                     return
 
                 print(f"Loading songs from {csv_path}...")
                 try:
-                    df = pd.read_csv(csv_path)
-                    # Deduplicate by track_id
-                    df = df.drop_duplicates(subset=["track_id"], keep="first")
-                    # Handle NaNs: convert NaN to None for object columns
-                    df = df.where(pd.notnull(df), None)
-
-                    songs_to_create = []
-                    for _, row in df.iterrows():
-                        try:
-                            song = SongModel(
-                                track_id=str(row["track_id"]),
-                                track_name=str(row["track_name"]),
-                                track_artist=str(row["track_artist"]),
-                                track_popularity=int(row["track_popularity"]),
-                                track_album_id=str(row["track_album_id"]),
-                                track_album_name=str(row["track_album_name"]),
-                                track_album_release_date=str(
-                                    row["track_album_release_date"]
-                                ),
-                                playlist_name=str(row["playlist_name"])
-                                if row["playlist_name"] is not None
-                                else None,
-                                playlist_id=str(row["playlist_id"])
-                                if row["playlist_id"] is not None
-                                else None,
-                                playlist_genre=str(row["playlist_genre"])
-                                if row["playlist_genre"] is not None
-                                else None,
-                                playlist_subgenre=str(row["playlist_subgenre"])
-                                if row["playlist_subgenre"] is not None
-                                else None,
-                                danceability=float(row["danceability"]),
-                                energy=float(row["energy"]),
-                                key=int(row["key"]),
-                                loudness=float(row["loudness"]),
-                                mode=int(row["mode"]),
-                                speechiness=float(row["speechiness"]),
-                                acousticness=float(row["acousticness"]),
-                                instrumentalness=float(row["instrumentalness"]),
-                                liveness=float(row["liveness"]),
-                                valence=float(row["valence"]),
-                                tempo=float(row["tempo"]),
-                                duration_ms=int(row["duration_ms"]),
-                            )
-                            songs_to_create.append(song)
-                        except ValueError as ve:
-                            print(f"Skipping row due to value error: {ve}")
-                            continue
-
-                    batch_size = 1000
-                    total_songs = len(songs_to_create)
-                    if total_songs > 0:
-                        print(f"Found {total_songs} songs to insert.")
-                        for i in range(0, total_songs, batch_size):
-                            batch = songs_to_create[i : i + batch_size]
-                            await repo.bulk_create(batch)
-                            print(
-                                f"Loaded {min(i + batch_size, total_songs)}/{total_songs} songs"
-                            )
-                        print("Data loading completed.")
+                    start = time.perf_counter()
+                    total = await load_csv(session, csv_path, chunk_size, progress)
+                    if total > 0:
+                        elapsed = time.perf_counter() - start
+                        print(
+                            f"Data loading completed: {total} songs in"
+                            f" {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)."
+                        )
                     else:
                         print("No songs found in CSV.")
 
@@ -90,3 +180,15 @@ async def seed_database():
                 print("Songs already loaded in database.")
         except Exception as e:
             print(f"Error during seeding: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed an empty database from a songs CSV file."
+    )
+    parser.add_argument(
+        "csv_path", nargs="?", default="src/resources/spotify_songs.csv"
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(seed_database(args.csv_path, chunk_size=args.chunk_size))
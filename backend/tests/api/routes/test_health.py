@@ -0,0 +1,47 @@
+import pytest
+from httpx import AsyncClient
+from main import app
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.api.dependencies import get_recommendation_index, get_warmup
+from src.core.config import settings
+from src.services.warmup import Warmup
+
+
+@pytest.mark.asyncio
+async def test_live(async_client: AsyncClient):
+    response = await async_client.get("/health/live")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_recommend_is_warming_until_ready(
+    async_client: AsyncClient, db_session: AsyncSession, tmp_path
+):
+    warmup = Warmup()
+    warmup.start()
+    warmup.report_seeding(1000, 0.25)
+    app.dependency_overrides[get_warmup] = lambda: warmup
+
+    response = await async_client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
+    assert response.json()["songs_loaded"] == 1000
+
+    payload = {"song_ids": ["any"], "limit": 5}
+    response = await async_client.post(f"{settings.API_V1_STR}/recommend/", json=payload)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert response.json()["detail"]["status"] == "warming"
+    assert response.json()["detail"]["seed_progress"] == 0.25
+
+    # Without a CSV seeding is skipped and the index is built
+    index = app.dependency_overrides[get_recommendation_index]()
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    await warmup.run(index, session_factory, str(tmp_path / "missing.csv"))
+    assert warmup.phase == "ready"
+
+    response = await async_client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    response = await async_client.post(f"{settings.API_V1_STR}/recommend/", json=payload)
+    assert response.status_code == 200
@@ -1,10 +1,20 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from httpx import AsyncClient
 from main import app
-from src.api.dependencies import get_deezer_repository, get_spotify_repository
+from src.api.dependencies import (
+    get_audio_cache,
+    get_audio_prefetcher,
+    get_deezer_repository,
+    get_spotify_repository,
+)
 from src.core.config import settings
+from src.repositories.song_repository import SongRepository
+from src.repositories.track_audio_repository import TrackAudioRepository
+from src.services.audio_prefetch import AudioPrefetcher
+from src.services.music_service import MusicService
 
 
 @pytest.fixture
@@ -52,15 +62,8 @@ def mock_music_services():
         del app.dependency_overrides[get_deezer_repository]
 
 
-@pytest.mark.asyncio
-async def test_get_audio_preview(async_client: AsyncClient, mock_music_services):
-    # Depending on implementation, it might check DB first or go straight to API
-    # Usually strictly fetches from Spotify/Deezer given a track_id
-
-    track_id = "spotify_id_123"
-
-    # Create song in DB first because MusicService checks existence
-    song_data = {
+def song_payload(track_id: str) -> dict:
+    return {
         "track_id": track_id,
         "track_name": "Mock Song",
         "track_artist": "Mock Artist",
@@ -81,7 +84,17 @@ async def test_get_audio_preview(async_client: AsyncClient, mock_music_services)
         "track_album_name": "Mock Album",
         "track_album_release_date": "2023-01-01",
     }
-    await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_data)
+
+
+@pytest.mark.asyncio
+async def test_get_audio_preview(async_client: AsyncClient, mock_music_services):
+    # Depending on implementation, it might check DB first or go straight to API
+    # Usually strictly fetches from Spotify/Deezer given a track_id
+
+    track_id = "spotify_id_123"
+
+    # Create song in DB first because MusicService checks existence
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_payload(track_id))
 
     response = await async_client.get(f"{settings.API_V1_STR}/music/audio/{track_id}")
 
@@ -89,3 +102,102 @@ async def test_get_audio_preview(async_client: AsyncClient, mock_music_services)
     data = response.json()
     assert data["track_name"] == "Mock Song"
     assert data["preview_url"] == "http://deezer.preview"
+
+
+@pytest.mark.asyncio
+async def test_get_audio_preview_is_cached(
+    async_client: AsyncClient, mock_music_services
+):
+    mock_deezer = app.dependency_overrides[get_deezer_repository]()
+    audio_cache = app.dependency_overrides[get_audio_cache]()
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_payload("hit"))
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_payload("miss"))
+
+    first = await async_client.get(f"{settings.API_V1_STR}/music/audio/hit")
+    second = await async_client.get(f"{settings.API_V1_STR}/music/audio/hit")
+    assert second.json() == first.json()
+    assert mock_deezer.search_song.call_count == 1
+
+    # The persisted copy answers once the in-memory tier is gone
+    audio_cache.memory.clear()
+    third = await async_client.get(f"{settings.API_V1_STR}/music/audio/hit")
+    assert third.json() == first.json()
+    assert mock_deezer.search_song.call_count == 1
+
+    # "Not found on Deezer" is cached too
+    mock_deezer.search_song.return_value = {"data": []}
+    for _ in range(2):
+        response = await async_client.get(f"{settings.API_V1_STR}/music/audio/miss")
+        assert response.json() == {"detail": "Song not found on Deezer"}
+    assert mock_deezer.search_song.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_songs_audio_batch(async_client: AsyncClient, mock_music_services):
+    mock_deezer = app.dependency_overrides[get_deezer_repository]()
+    for track_id in ("a", "b"):
+        await async_client.post(
+            f"{settings.API_V1_STR}/songs/", json=song_payload(track_id)
+        )
+
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/music/audio/batch",
+        json={"track_ids": ["a", "b", "a", "unknown"]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data["results"]) == ["a", "b"]
+    assert data["results"]["b"]["preview_url"] == "http://deezer.preview"
+    assert data["errors"] == {"unknown": "Song not found in database"}
+    # The repeated id is looked up once
+    assert mock_deezer.search_song.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_recommended_tracks_are_prefetched(
+    async_client: AsyncClient, mock_music_services
+):
+    mock_deezer = app.dependency_overrides[get_deezer_repository]()
+    audio_cache = app.dependency_overrides[get_audio_cache]()
+    prefetcher = AudioPrefetcher(maxsize=100, batch_size=10)
+    app.dependency_overrides[get_audio_prefetcher] = lambda: prefetcher
+    for track_id in ("seed", "other_1", "other_2"):
+        await async_client.post(
+            f"{settings.API_V1_STR}/songs/", json=song_payload(track_id)
+        )
+
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/?prefetch_audio=true",
+        json={"song_ids": ["seed"], "limit": 2},
+    )
+    recommended = [song["track_id"] for song in response.json()]
+    assert len(recommended) == 2
+    # Already queued
+    prefetcher.enqueue(recommended)
+    assert prefetcher.stats()["deduplicated"] == 2
+
+    def make_service(session):
+        return MusicService(
+            SongRepository(session),
+            mock_deezer,
+            None,
+            None,
+            TrackAudioRepository(session),
+            audio_cache,
+        )
+
+    worker = asyncio.create_task(
+        prefetcher.run(audio_cache.session_factory, make_service)
+    )
+    await prefetcher.join()
+    worker.cancel()
+    assert prefetcher.stats()["prefetched"] == 2
+    assert mock_deezer.search_song.call_count == 2
+
+    for track_id in recommended:
+        await async_client.get(f"{settings.API_V1_STR}/music/audio/{track_id}")
+    assert mock_deezer.search_song.call_count == 2
+
+    response = await async_client.get("/health/audio-cache")
+    assert response.json()["cache"]["hit_rate"] == 1.0
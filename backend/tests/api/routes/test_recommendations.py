@@ -1,6 +1,11 @@
+from unittest.mock import AsyncMock
+
 import pytest
 from httpx import AsyncClient
+from main import app
+from src.api.dependencies import get_song_feature_agent
 from src.core.config import settings
+from src.domain.schemas.song import SongFeatures
 
 
 @pytest.mark.asyncio
@@ -129,3 +134,184 @@ async def test_recommend_by_text(async_client: AsyncClient):
 
     found_ids = [s["track_id"] for s in data]
     assert "text_match" in found_ids
+
+
+@pytest.mark.asyncio
+async def test_recommend_reflects_song_writes(async_client: AsyncClient):
+    base_song = {
+        "track_artist": "Artist",
+        "track_popularity": 50,
+        "key": 1,
+        "mode": 1,
+        "speechiness": 0.05,
+        "liveness": 0.1,
+        "duration_ms": 200000,
+        "track_album_id": "album_5",
+        "track_album_name": "Write Album",
+        "track_album_release_date": "2023-01-01",
+    }
+    seed = {
+        **base_song,
+        "track_id": "write_seed",
+        "track_name": "Seed",
+        "danceability": 0.8,
+        "energy": 0.8,
+        "loudness": -5.0,
+        "acousticness": 0.1,
+        "instrumentalness": 0.0,
+        "valence": 0.8,
+        "tempo": 120.0,
+    }
+    far = {
+        **base_song,
+        "track_id": "write_far",
+        "track_name": "Far",
+        "danceability": 0.1,
+        "energy": 0.1,
+        "loudness": -20.0,
+        "acousticness": 0.9,
+        "instrumentalness": 0.9,
+        "valence": 0.1,
+        "tempo": 60.0,
+    }
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=seed)
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=far)
+
+    payload = {"song_ids": ["write_seed"], "limit": 2}
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/", json=payload
+    )
+    assert [s["track_id"] for s in response.json()] == ["write_seed", "write_far"]
+
+    # A song created after the index was built is picked up incrementally
+    close = {**seed, "track_id": "write_close", "track_name": "Close", "energy": 0.79}
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=close)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/", json=payload
+    )
+    assert [s["track_id"] for s in response.json()] == ["write_seed", "write_close"]
+
+    # Deleted songs are no longer recommended
+    await async_client.delete(f"{settings.API_V1_STR}/songs/write_close")
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/", json=payload
+    )
+    assert [s["track_id"] for s in response.json()] == ["write_seed", "write_far"]
+
+
+@pytest.mark.asyncio
+async def test_recommend_batch(async_client: AsyncClient):
+    for i, energy in enumerate([0.1, 0.15, 0.85, 0.9]):
+        song = {
+            "track_id": f"batch_{i}",
+            "track_name": f"Batch {i}",
+            "track_artist": "Batch Artist",
+            "track_popularity": 50,
+            "danceability": energy,
+            "energy": energy,
+            "key": 1,
+            "loudness": -5.0,
+            "mode": 1,
+            "speechiness": 0.05,
+            "acousticness": 0.1,
+            "instrumentalness": 0.0,
+            "liveness": 0.1,
+            "valence": energy,
+            "tempo": 120.0,
+            "duration_ms": 200000,
+            "track_album_id": "album_6",
+            "track_album_name": "Batch Album",
+            "track_album_release_date": "2023-01-01",
+        }
+        await async_client.post(f"{settings.API_V1_STR}/songs/", json=song)
+
+    payload = [
+        {"song_ids": ["batch_3"], "limit": 2},
+        {"song_ids": ["unknown"], "limit": 2},
+        {"song_ids": ["batch_0"], "limit": 1},
+    ]
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/batch", json=payload
+    )
+    assert response.status_code == 200
+    data = response.json()
+
+    # Results come back in request order, each cut to its own limit
+    assert [[s["track_id"] for s in songs] for songs in data] == [
+        ["batch_3", "batch_2"],
+        [],
+        ["batch_0"],
+    ]
+
+    # Repeated queries, seeds in any order, are served from the cache
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/batch",
+        json=[{"song_ids": ["batch_0", "batch_3"], "limit": 2}, *payload],
+    )
+    assert [[s["track_id"] for s in songs] for songs in response.json()[1:]] == [
+        ["batch_3", "batch_2"],
+        [],
+        ["batch_0"],
+    ]
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/",
+        json={"song_ids": ["batch_3", "batch_0"], "limit": 2},
+    )
+    assert len(response.json()) == 2
+    stats = (await async_client.get("/health/recommendation-cache")).json()
+    assert (stats["hits"], stats["misses"]) == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_text_with_partial_features(async_client: AsyncClient):
+    base_song = {
+        "track_artist": "Artist",
+        "track_popularity": 50,
+        "key": 0,
+        "mode": 1,
+        "speechiness": 0.05,
+        "liveness": 0.1,
+        "duration_ms": 200000,
+        "track_album_id": "album_7",
+        "track_album_name": "Partial Album",
+        "track_album_release_date": "2023-01-01",
+    }
+    # Calm and sad, but otherwise like a party song
+    calm = {
+        **base_song,
+        "track_id": "partial_calm",
+        "track_name": "Calm",
+        "danceability": 0.9,
+        "energy": 0.1,
+        "loudness": -5.0,
+        "acousticness": 0.1,
+        "instrumentalness": 0.0,
+        "valence": 0.1,
+        "tempo": 128.0,
+    }
+    party = {
+        **calm,
+        "track_id": "partial_party",
+        "track_name": "Party",
+        "energy": 0.9,
+        "valence": 0.9,
+    }
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=calm)
+    await async_client.post(f"{settings.API_V1_STR}/songs/", json=party)
+
+    # Only the features the prompt implies are filled in
+    agent = AsyncMock(return_value=SongFeatures(energy=0.15, valence=0.05))
+    app.dependency_overrides[get_song_feature_agent] = lambda: agent
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/text",
+        json={"text_input": "something calm and sad", "limit": 1},
+    )
+    assert response.status_code == 200
+    assert [s["track_id"] for s in response.json()] == ["partial_calm"]
+
+    agent.return_value = SongFeatures()
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/recommend/text",
+        json={"text_input": "anything", "limit": 1},
+    )
+    assert response.json() == []
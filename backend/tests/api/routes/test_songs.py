@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+
 import pytest
 from httpx import AsyncClient
 from src.core.config import settings
@@ -178,3 +182,161 @@ async def test_delete_song(async_client: AsyncClient):
     # Verify gone
     response = await async_client.get(f"{settings.API_V1_STR}/songs/delete_track")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_songs(async_client: AsyncClient):
+    songs = [
+        ("search_1", "Yellow Submarine", "The Beatles"),
+        ("search_2", "Beat It", "Michael Jackson"),
+        ("search_3", "Submarine Dreams", "Yellow Band"),
+    ]
+    for track_id, name, artist in songs:
+        song_data = {
+            "track_id": track_id,
+            "track_name": name,
+            "track_artist": artist,
+            "track_popularity": 50,
+            "danceability": 0.5,
+            "energy": 0.5,
+            "key": 1,
+            "loudness": -10.0,
+            "mode": 1,
+            "speechiness": 0.1,
+            "acousticness": 0.2,
+            "instrumentalness": 0.0,
+            "liveness": 0.1,
+            "valence": 0.5,
+            "tempo": 100.0,
+            "duration_ms": 200000,
+            "track_album_id": "album_1",
+            "track_album_name": "Test Album",
+            "track_album_release_date": "2023-01-01",
+        }
+        await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_data)
+
+    # Every word is matched as a prefix of the name or artist
+    response = await async_client.get(f"{settings.API_V1_STR}/songs/?search=beat")
+    assert {s["track_id"] for s in response.json()} == {"search_1", "search_2"}
+
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/songs/?search=yellow%20sub"
+    )
+    assert {s["track_id"] for s in response.json()} == {"search_1", "search_3"}
+
+    # The search index follows updates and deletes
+    await async_client.put(
+        f"{settings.API_V1_STR}/songs/search_2", json={"track_name": "Thriller"}
+    )
+    await async_client.delete(f"{settings.API_V1_STR}/songs/search_1")
+    response = await async_client.get(f"{settings.API_V1_STR}/songs/?search=beat")
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_list_songs_with_cursor(async_client: AsyncClient):
+    for i in range(5):
+        song_data = {
+            "track_id": f"cursor_track_{i}",
+            "track_name": f"Cursor Song {i}",
+            "track_artist": "Cursor Artist",
+            "track_popularity": 50,
+            "danceability": 0.5,
+            "energy": 0.5,
+            "key": 1,
+            "loudness": -10.0,
+            "mode": 1,
+            "speechiness": 0.1,
+            "acousticness": 0.2,
+            "instrumentalness": 0.0,
+            "liveness": 0.1,
+            "valence": 0.5,
+            "tempo": 100.0,
+            "duration_ms": 200000,
+            "track_album_id": "album_1",
+            "track_album_name": "Test Album",
+            "track_album_release_date": "2023-01-01",
+        }
+        await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_data)
+
+    for search in (None, "Cursor"):
+        params = {"limit": 2}
+        if search:
+            params["search"] = search
+        seen = []
+        while True:
+            response = await async_client.get(
+                f"{settings.API_V1_STR}/songs/", params=params
+            )
+            assert response.status_code == 200
+            seen.extend(song["track_id"] for song in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        cursor_ids = [t for t in seen if t.startswith("cursor_track_")]
+        assert sorted(cursor_ids) == [f"cursor_track_{i}" for i in range(5)]
+        assert len(seen) == len(set(seen))
+
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/songs/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_songs(async_client: AsyncClient):
+    for i in range(3):
+        song_data = {
+            "track_id": f"export_track_{i}",
+            "track_name": f"Export, Song {i}",
+            "track_artist": "Export Artist",
+            "track_popularity": 50,
+            "danceability": 0.5,
+            "energy": 0.5,
+            "key": 1,
+            "loudness": -10.0,
+            "mode": 1,
+            "speechiness": 0.1,
+            "acousticness": 0.2,
+            "instrumentalness": 0.0,
+            "liveness": 0.1,
+            "valence": 0.5,
+            "tempo": 100.0,
+            "duration_ms": 200000,
+            "track_album_id": "album_1",
+            "track_album_name": "Test Album",
+            "track_album_release_date": "2023-01-01",
+        }
+        await async_client.post(f"{settings.API_V1_STR}/songs/", json=song_data)
+
+    for validate in ("false", "true"):
+        response = await async_client.get(
+            f"{settings.API_V1_STR}/songs/export",
+            params={"format": "ndjson", "validate": validate},
+        )
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["track_id"] for r in rows] == [f"export_track_{i}" for i in range(3)]
+        assert rows[0]["track_name"] == "Export, Song 0"
+
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/songs/export", params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["track_id"] for r in rows] == [f"export_track_{i}" for i in range(3)]
+    assert rows[2]["track_name"] == "Export, Song 2"
+
+
+@pytest.mark.asyncio
+async def test_song_schemas_document_required_features(async_client: AsyncClient):
+    response = await async_client.get(f"{settings.API_V1_STR}/openapi.json")
+    schemas = response.json()["components"]["schemas"]
+
+    for name in ("SongCreate", "SongResponse"):
+        tempo = schemas[name]["properties"]["tempo"]
+        assert tempo["type"] == "number"
+        assert tempo["description"].startswith("BPM.")
+        assert "tempo" in schemas[name]["required"]
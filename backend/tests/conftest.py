@@ -13,9 +13,23 @@ from httpx import ASGITransport, AsyncClient
 from main import app
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from src.agents.song_feature_agent import SongFeaturesAgent
-from src.api.dependencies import get_db_session, get_song_feature_agent
+from src.api.dependencies import (
+    get_audio_cache,
+    get_db_session,
+    get_prompt_cache,
+    get_recommendation_cache,
+    get_recommendation_index,
+    get_song_feature_agent,
+)
+from src.core.config import settings
+from src.domain.models.prompt_features import PromptFeaturesModel  # noqa: F401
 from src.domain.models.song import Base
+from src.domain.models.track_audio import TrackAudioModel  # noqa: F401
 from src.domain.schemas.song import SongFeatures
+from src.services.audio_cache import AudioCache
+from src.services.prompt_cache import PromptCache
+from src.services.recommendation_cache import RecommendationCache
+from src.services.recommendation_index import RecommendationIndex
 
 # Use file-based SQLite database for testing to avoid in-memory persistence issues
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -69,6 +83,25 @@ async def async_client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient,
 
     app.dependency_overrides[get_db_session] = override_get_db_session
 
+    # Each test gets its own index so it is built from that test's database
+    test_index = RecommendationIndex()
+    app.dependency_overrides[get_recommendation_index] = lambda: test_index
+    test_recommendation_cache = RecommendationCache(
+        settings.RECOMMENDATION_CACHE_SIZE,
+        settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+        settings.RECOMMENDATION_CACHE_QUANTUM,
+    )
+    app.dependency_overrides[get_recommendation_cache] = (
+        lambda: test_recommendation_cache
+    )
+    cache_sessions = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    test_audio_cache = AudioCache(settings.AUDIO_CACHE_SIZE, cache_sessions)
+    app.dependency_overrides[get_audio_cache] = lambda: test_audio_cache
+    test_prompt_cache = PromptCache(
+        settings.PROMPT_CACHE_SIZE, settings.PROMPT_CACHE_SIMILARITY, cache_sessions
+    )
+    app.dependency_overrides[get_prompt_cache] = lambda: test_prompt_cache
+
     # We will also mock the agent by default to avoid API calls
     async def override_get_agent():
         # The service calls agent(input). This invokes __call__.
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+from src.repositories.feature_store import FeatureStore
+
+
+def test_feature_store_round_trip(tmp_path):
+    store = FeatureStore(str(tmp_path / "features"))
+    assert store.current_snapshot() is None
+
+    track_ids = np.array(["track_a", "track_b"])
+    features = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float64)
+    store.write(track_ids, features)
+
+    loaded_ids, loaded_features = store.load()
+    # Loaded arrays are read-only memory maps of the stored float32 matrix
+    assert isinstance(loaded_features, np.memmap)
+    assert loaded_features.dtype == np.float32
+    assert not loaded_features.flags.writeable
+    assert loaded_ids.tolist() == ["track_a", "track_b"]
+    assert store.current_snapshot() == 1
+
+
+def test_feature_store_load_keeps_snapshot_pairs(tmp_path):
+    store = FeatureStore(str(tmp_path / "features"))
+    first = store.write(np.array(["track_a"]), np.array([[0.1, 0.2]]))
+    second = store.write(
+        np.array(["track_b", "track_c"]), np.array([[0.3, 0.4], [0.5, 0.6]])
+    )
+    store.write(np.array(["track_d"]), np.array([[0.7, 0.8]]))
+
+    # Maps taken before later writes keep pairing their own ids and rows
+    assert first[0].tolist() == ["track_a"]
+    assert first[1].tolist() == [[np.float32(0.1), np.float32(0.2)]]
+    assert second[0].tolist() == ["track_b", "track_c"]
+    assert len(second[1]) == 2
+    loaded_ids, loaded_features = store.load()
+    assert loaded_ids.tolist() == ["track_d"]
+    assert len(loaded_features) == 1
+    # Only the two newest snapshots stay on disk
+    assert sorted(os.listdir(tmp_path / "features" / "snapshots")) == ["2", "3"]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from src.repositories import index_store
+from src.repositories.index_store import IndexStore
+
+
+def test_index_store_publishes_checksummed_generations(tmp_path, monkeypatch):
+    store = IndexStore(str(tmp_path))
+    assert store.current_generation() is None
+
+    with store.lock():
+        for _ in range(3):
+            generation = store.publish(
+                {"features": np.arange(6, dtype=np.float32).reshape(3, 2)},
+                {"songs": 3},
+            )
+
+    assert generation == store.current_generation() == 3
+    assert store.metadata(3)["songs"] == 3
+    bundle = store.load(3)
+    # Arrays come back as read-only memory maps
+    assert isinstance(bundle["features"], np.memmap)
+    assert not bundle["features"].flags.writeable
+    # Only the two newest generations are kept
+    assert sorted((tmp_path / "generations").iterdir())[0].name == "2"
+
+    with open(tmp_path / "generations" / "2" / "index.joblib", "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"\0")
+    with pytest.raises(ValueError, match="checksum"):
+        store.load(2)
+
+    # A generation's checksum is only computed the first time it is loaded
+    def no_rehash(path):
+        raise AssertionError(f"{path} was hashed again")
+
+    monkeypatch.setattr(index_store, "_file_sha256", no_rehash)
+    store.load(3)
+
+    with store.lock():
+        store.update_metadata(2, format_version=0)
+    with pytest.raises(ValueError, match="format 0"):
+        store.load(2)
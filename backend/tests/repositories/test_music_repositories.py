@@ -0,0 +1,36 @@
+import httpx
+import pytest
+from src.repositories.deezer_repository import DeezerRepository
+from src.repositories.spotify_repository import SpotifyRepository
+
+
+@pytest.mark.asyncio
+async def test_repositories_use_the_shared_client():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/api/token":
+            return httpx.Response(200, json={"access_token": "token"})
+        return httpx.Response(200, json={"data": []})
+
+    transport = httpx.MockTransport(handler)
+    async with (
+        httpx.AsyncClient(transport=transport, base_url="https://deezer.test") as deezer,
+        httpx.AsyncClient(
+            transport=transport, base_url="https://spotify.test/v1"
+        ) as spotify,
+    ):
+        await DeezerRepository(deezer).search_song("Song", "Artist")
+        repo = SpotifyRepository(spotify)
+        repo.account_url = "https://accounts.test/api/token"
+        token = await repo.create_token()
+        await repo.search_song("Song", "Artist", token)
+
+    assert [str(r.url.copy_with(query=None)) for r in requests] == [
+        "https://deezer.test/search",
+        "https://accounts.test/api/token",
+        "https://spotify.test/v1/search",
+    ]
+    assert requests[0].url.params["q"] == 'track:"Song" artist:"Artist"'
+    assert requests[2].headers["Authorization"] == "Bearer token"
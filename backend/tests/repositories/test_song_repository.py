@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.song import SongModel
+from src.repositories.song_repository import FINGERPRINT_SCALE, SongRepository
+
+
+def song_row(track_id: str, name: str, artist: str) -> tuple:
+    values = {
+        "track_id": track_id,
+        "track_name": name,
+        "track_artist": artist,
+        "track_popularity": 50,
+        "track_album_id": "album_1",
+        "track_album_name": "Test Album",
+        "track_album_release_date": "2023-01-01",
+        "playlist_name": None,
+        "playlist_id": None,
+        "playlist_genre": None,
+        "playlist_subgenre": None,
+        "danceability": 0.5,
+        "energy": 0.5,
+        "key": 1,
+        "loudness": -10.0,
+        "mode": 1,
+        "speechiness": 0.1,
+        "acousticness": 0.2,
+        "instrumentalness": 0.0,
+        "liveness": 0.1,
+        "valence": 0.5,
+        "tempo": 100.0,
+        "duration_ms": 200000,
+    }
+    return tuple(values[c.name] for c in SongModel.__table__.columns)
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_keeps_search_index(db_session: AsyncSession):
+    repo = SongRepository(db_session)
+    async with repo.bulk_load():
+        await repo.bulk_insert(
+            [
+                song_row("bulk_1", "Yellow Submarine", "The Beatles"),
+                song_row("bulk_2", "Beat It", "Michael Jackson"),
+            ]
+        )
+    assert [s.track_id for s in await repo.get_all(search="submarine")] == ["bulk_1"]
+
+    # A failed load is rolled back as a whole
+    with pytest.raises(RuntimeError):
+        async with repo.bulk_load():
+            await repo.bulk_insert([song_row("bulk_3", "Lost Song", "Nobody")])
+            raise RuntimeError("interrupted")
+    assert await repo.get_by_id("bulk_3") is None
+
+    # Songs written one at a time are still indexed afterwards
+    row = song_row("single_1", "Submarine Blues", "Someone")
+    await repo.create(SongModel(**dict(zip(SongModel.__table__.columns.keys(), row))))
+    results = await repo.get_all(search="submarine")
+    assert sorted(s.track_id for s in results) == ["bulk_1", "single_1"]
+
+
+@pytest.mark.asyncio
+async def test_feature_fingerprint_sums_quantized_features(db_session: AsyncSession):
+    repo = SongRepository(db_session)
+    async with repo.bulk_load():
+        await repo.bulk_insert(
+            [song_row("fp_1", "One", "Someone"), song_row("fp_22", "Two", "Someone")]
+        )
+
+    fingerprint = await repo.feature_fingerprint(["tempo", "loudness", "valence"])
+    assert fingerprint == [
+        2,
+        "fp_1",
+        "fp_22",
+        9,
+        200 * FINGERPRINT_SCALE,
+        -20 * FINGERPRINT_SCALE,
+        FINGERPRINT_SCALE,
+    ]
+    assert all(type(x) is int for x in fingerprint[4:])
@@ -0,0 +1,38 @@
+import numpy as np
+from sklearn.neighbors import NearestNeighbors  # type: ignore
+from src.services.neighbor_backends import IVFIndex
+
+
+def _random_catalogue(n_songs: int = 2000, n_queries: int = 50):
+    rng = np.random.default_rng(42)
+    return rng.random((n_songs, 10)), rng.random((n_queries, 10))
+
+
+def test_ivf_probing_every_cell_is_exact():
+    vectors, queries = _random_catalogue()
+    exact = NearestNeighbors(algorithm="brute").fit(vectors)
+    ivf = IVFIndex(n_lists=16, n_probes=16).fit(vectors)
+
+    _, expected = exact.kneighbors(queries, n_neighbors=10)
+    _, found = ivf.kneighbors(queries, n_neighbors=10)
+    assert (found == expected).all()
+
+
+def test_ivf_recall_with_few_probes():
+    vectors, queries = _random_catalogue()
+    exact = NearestNeighbors(algorithm="brute").fit(vectors)
+    ivf = IVFIndex(n_lists=16, n_probes=4).fit(vectors)
+
+    _, expected = exact.kneighbors(queries, n_neighbors=10)
+    distances, found = ivf.kneighbors(queries, n_neighbors=10)
+    recall = np.mean([len(set(f) & set(e)) / 10 for f, e in zip(found, expected)])
+    assert recall > 0.8
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_ivf_returns_enough_neighbours_from_small_cells():
+    vectors, queries = _random_catalogue(n_songs=40)
+    ivf = IVFIndex(n_lists=20, n_probes=1).fit(vectors)
+
+    _, found = ivf.kneighbors(queries, n_neighbors=40)
+    assert all(sorted(row) == list(range(40)) for row in found.tolist())
@@ -0,0 +1,80 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.domain.schemas.song import SongFeatures
+from src.repositories.prompt_features_repository import PromptFeaturesRepository
+from src.services.prompt_cache import PromptCache
+from src.services.text_structure import TextStructureService
+
+FEATURES = SongFeatures(
+    danceability=0.5,
+    energy=0.5,
+    key=0,
+    loudness=-5.0,
+    mode=1,
+    speechiness=0.05,
+    acousticness=0.1,
+    instrumentalness=0.0,
+    liveness=0.1,
+    valence=0.5,
+    tempo=120.0,
+)
+
+
+@pytest.mark.asyncio
+async def test_prompt_features_are_cached(db_session: AsyncSession):
+    sessions = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    agent = AsyncMock(return_value=FEATURES)
+
+    def service(cache: PromptCache) -> TextStructureService:
+        return TextStructureService(
+            agent, None, PromptFeaturesRepository(db_session), cache
+        )
+
+    cache = PromptCache(100, 0.8, sessions)
+    # Concurrent identical prompts share one agent call
+    await asyncio.gather(
+        *(service(cache).extract_features("Music for studying") for _ in range(3))
+    )
+    assert await service(cache).extract_features("  music FOR studying!! ") == FEATURES
+    assert agent.await_count == 1
+
+    await service(cache).extract_features("upbeat party songs")
+    await service(cache).extract_features("Upbeat party song")
+    await service(cache).extract_features("calm piano music")
+    assert agent.await_count == 3
+    assert cache.stats()["similar_hits"] == 1
+
+    # A new process finds the answers in the database
+    restarted = PromptCache(100, 0.8, sessions)
+    await service(restarted).extract_features("music for studying")
+    await service(restarted).extract_features("upbeat party song!")
+    assert agent.await_count == 3
+    assert restarted.stats()["misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_exact_persisted_prompt_wins_over_a_similar_one(
+    db_session: AsyncSession,
+):
+    sessions = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    calm = FEATURES.model_copy(update={"valence": 0.1})
+    agent = AsyncMock(side_effect=[calm, FEATURES])
+    repo = PromptFeaturesRepository(db_session)
+
+    # Both prompts are asked, as with the default similarity of 0
+    cache = PromptCache(100, 0.0, sessions)
+    service = TextStructureService(agent, None, repo, cache)
+    await service.extract_features("unhappy upbeat songs for a party")
+    await service.extract_features("happy upbeat songs for a party")
+
+    # Only the newest prompt is loaded back into memory; the other one is
+    # still found in the database before any similar prompt is tried
+    restarted = PromptCache(1, 0.8, sessions)
+    service = TextStructureService(agent, None, repo, restarted)
+    assert await service.extract_features("unhappy upbeat songs for a party") == calm
+    assert restarted.stats()["persisted_hits"] == 1
+    assert restarted.stats()["similar_hits"] == 0
+    assert agent.await_count == 2
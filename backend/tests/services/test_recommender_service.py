@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from src.services.recommendation_index import FEATURES, RecommendationIndex
+from src.services.recommender_service import RecommenderService
+
+
+class FeatureRows:
+    def __init__(self, n_songs: int):
+        rng = np.random.default_rng(0)
+        self.rows = [
+            (f"track_{i}", *rng.random(len(FEATURES)).tolist()) for i in range(n_songs)
+        ]
+
+    async def stream_features(self, features: list[str], batch_size: int = 10000):
+        yield self.rows
+
+
+class Song:
+    def __init__(self, track_id: str, value: float):
+        self.track_id = track_id
+        for feature in FEATURES:
+            setattr(self, feature, value)
+
+
+class CompactingPool:
+    """Compacts the index after the request read it, before its query runs."""
+
+    def __init__(self, index: RecommendationIndex):
+        self.index = index
+
+    async def run(self, func, *args):
+        self.index.upsert_song(Song("outlier", 100.0))
+        await self.index.compact()
+        return func(*args)
+
+
+@pytest.mark.asyncio
+async def test_batch_query_reads_one_index_state():
+    repo = FeatureRows(200)
+    index = RecommendationIndex()
+    await index.build(repo)
+    queries = [(["track_1", "track_2"], 5), (["missing"], 5)]
+    expected = RecommenderService._query_batch(index.state, queries)
+
+    service = RecommenderService(repo, index, pool=CompactingPool(index))
+    state = index.state
+    computed = await service._compute(service._query_batch, state, queries)
+
+    # The compaction rescaled every song, yet seeds and neighbours both come
+    # from the state the request started with
+    assert index.state is not state
+    assert computed == expected
+    assert computed[1] == []
@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+from src.repositories.index_store import IndexStore
+from src.repositories.song_repository import FINGERPRINT_SCALE
+from src.services.recommendation_index import FEATURES, RecommendationIndex
+
+
+class FeatureRows:
+    """Serves feature rows the way SongRepository does."""
+
+    def __init__(self, n_songs: int):
+        rng = np.random.default_rng(0)
+        self.rows = [
+            (f"track_{i}", *rng.random(len(FEATURES)).tolist()) for i in range(n_songs)
+        ]
+
+    async def stream_features(self, features: list[str], batch_size: int = 10000):
+        for i in range(0, len(self.rows), batch_size):
+            yield self.rows[i : i + batch_size]
+
+    async def feature_fingerprint(self, features: list[str]) -> list:
+        track_ids = [row[0] for row in self.rows]
+        units = np.round(np.array([row[1:] for row in self.rows]) * FINGERPRINT_SCALE)
+        return [
+            len(track_ids),
+            min(track_ids, default=None),
+            max(track_ids, default=None),
+            sum(map(len, track_ids)),
+            *units.astype(np.int64).sum(axis=0).tolist(),
+        ]
+
+
+class UnreadableRows(FeatureRows):
+    """Serves the fingerprint only, as if the songs must not be read."""
+
+    async def stream_features(self, features: list[str], batch_size: int = 10000):
+        raise AssertionError("the songs were read")
+        yield
+
+
+class Song:
+    def __init__(self, track_id: str, value: float):
+        self.track_id = track_id
+        for feature in FEATURES:
+            setattr(self, feature, value)
+
+
+@pytest.mark.asyncio
+async def test_workers_map_one_published_generation(tmp_path):
+    store = IndexStore(str(tmp_path))
+    repo = FeatureRows(500)
+    first, second = RecommendationIndex(index_store=store), RecommendationIndex(
+        index_store=store
+    )
+
+    await first.build(repo)
+    await second.build(repo)
+
+    # The second worker mapped the first one's generation instead of publishing
+    assert first.generation == second.generation == store.current_generation() == 1
+    assert isinstance(second._state.snapshot.scaled_features, np.memmap)
+    vectors = second.seed_vectors([["track_3", "track_7"]])[0]
+    assert second.query(vectors, 5) == first.query(vectors, 5)
+    assert second.seed_vectors([["missing"]])[1].tolist() == [False]
+
+
+@pytest.mark.asyncio
+async def test_workers_swap_to_a_newer_generation(tmp_path):
+    store = IndexStore(str(tmp_path))
+    repo = FeatureRows(500)
+    first, second = RecommendationIndex(index_store=store), RecommendationIndex(
+        index_store=store
+    )
+    await first.build(repo)
+    await second.build(repo)
+
+    first.upsert_song(Song("new_song", 0.5))
+    second.remove_song("track_1")
+    await first.compact()
+    assert store.current_generation() == 2
+    assert not await first.refresh()
+
+    assert await second.refresh()
+    assert second.generation == 2
+    # The new song comes from the generation, the removal is kept locally
+    assert second.size == 500
+    rows = second._state.locate(["new_song", "track_1"])
+    assert rows[0] >= 0 and rows[1] == -1
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_compactions_keep_both_workers_writes(tmp_path):
+    store = IndexStore(str(tmp_path))
+    repo = FeatureRows(500)
+    first, second = RecommendationIndex(index_store=store), RecommendationIndex(
+        index_store=store
+    )
+    await first.build(repo)
+    await second.build(repo)
+
+    first.upsert_song(Song("first_song", 0.5))
+    second.upsert_song(Song("second_song", 0.25))
+    second.remove_song("track_1")
+    await first.compact()
+    # The second worker compacts before polling for the first one's generation
+    await second.compact()
+
+    assert store.current_generation() == 3
+    assert second.generation == 3
+    await first.refresh()
+    for index in (first, second):
+        assert index.size == 501
+        rows = index._state.locate(["first_song", "second_song", "track_1"])
+        assert rows[0] >= 0 and rows[1] >= 0 and rows[2] == -1
+        assert index._state.pending_changes == 0
+
+
+@pytest.mark.asyncio
+async def test_build_maps_the_generation_of_the_same_catalogue(tmp_path):
+    store = IndexStore(str(tmp_path))
+    repo = FeatureRows(500)
+    await RecommendationIndex(index_store=store).build(repo)
+
+    index = RecommendationIndex(index_store=store, rebuild_on_mismatch=False)
+    await index.build(UnreadableRows(500))
+    assert index.generation == 1 and index.size == 500
+
+    # Another catalogue: refuse, or fit and publish a new generation
+    with pytest.raises(RuntimeError, match="index_builder"):
+        await RecommendationIndex(index_store=store, rebuild_on_mismatch=False).build(
+            FeatureRows(400)
+        )
+    index = RecommendationIndex(index_store=store)
+    await index.build(FeatureRows(400))
+    assert index.generation == 2 and index.size == 400
+
+
+@pytest.mark.asyncio
+async def test_restart_maps_the_generation_of_a_compaction(tmp_path):
+    store = IndexStore(str(tmp_path))
+    repo = FeatureRows(500)
+    index = RecommendationIndex(
+        index_store=store,
+        fingerprint_source=lambda: repo.feature_fingerprint(FEATURES),
+    )
+    await index.build(repo)
+
+    # A song written to the database and to the index, then compacted
+    repo.rows.append(("new_song", *[0.5] * len(FEATURES)))
+    index.upsert_song(Song("new_song", 0.5))
+    await index.compact()
+    assert index.generation == 2
+
+    restarted = RecommendationIndex(index_store=store, rebuild_on_mismatch=False)
+    unreadable = UnreadableRows(0)
+    unreadable.rows = repo.rows
+    await restarted.build(unreadable)
+    assert restarted.generation == 2 and restarted.size == 501
+
+    # A database write the compacted rows lack leaves no fingerprint
+    repo.rows.append(("other_song", *[0.25] * len(FEATURES)))
+    index.upsert_song(Song("third_song", 0.75))
+    await index.compact()
+    assert store.metadata(3)["catalogue_fingerprint"] is None
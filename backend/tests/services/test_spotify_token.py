@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from src.services.spotify_token import SpotifyTokenManager
+
+
+class FakeSpotifyRepository:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_token(self) -> tuple[str, float]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"token_{self.calls}", 3600.0
+
+
+@pytest.mark.asyncio
+async def test_token_is_cached_and_refreshed_once():
+    now = 0.0
+    manager = SpotifyTokenManager(refresh_margin=60, clock=lambda: now)
+    repo = FakeSpotifyRepository()
+
+    # Concurrent cold requests share one token request
+    tokens = await asyncio.gather(*(manager.get_token(repo) for _ in range(10)))
+    assert tokens == ["token_1"] * 10
+    assert repo.calls == 1
+
+    now = 1000.0
+    assert await manager.get_token(repo) == "token_1"
+    assert repo.calls == 1
+
+    # Close to expiry the cached token is served while it refreshes
+    now = 3590.0
+    tokens = await asyncio.gather(*(manager.get_token(repo) for _ in range(10)))
+    assert tokens == ["token_1"] * 10
+    await asyncio.sleep(0.05)
+    assert repo.calls == 2
+    assert await manager.get_token(repo) == "token_2"
+
+    # Once expired, requests wait for a new token
+    now = 3590.0 + 3600.0
+    assert await manager.get_token(repo) == "token_3"
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+from src.utils.concurrency import ComputePool, PoolSaturated
+
+
+@pytest.mark.asyncio
+async def test_compute_pool_runs_off_the_event_loop_thread():
+    pool = ComputePool(max_workers=2, max_queued=0)
+
+    thread = await pool.run(threading.current_thread)
+
+    assert thread is not threading.current_thread()
+    assert pool.stats()["completed"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_compute_pool_rejects_calls_beyond_its_queue():
+    pool = ComputePool(max_workers=1, max_queued=1)
+    release = threading.Event()
+
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(PoolSaturated):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+    assert pool.stats() == {
+        "workers": 1,
+        "in_flight": 0,
+        "completed": 2,
+        "failed": 0,
+        "rejected": 1,
+    }
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_compute_pool_counts_cancelled_calls_until_their_worker_finishes():
+    pool = ComputePool(max_workers=1, max_queued=0)
+    release = threading.Event()
+
+    request = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    # The worker is still busy, so the bound still holds
+    assert pool.stats()["in_flight"] == 1
+    with pytest.raises(PoolSaturated):
+        await pool.run(release.wait)
+
+    release.set()
+    while pool.stats()["in_flight"]:
+        await asyncio.sleep(0.01)
+    with pytest.raises(ZeroDivisionError):
+        await pool.run(lambda: 1 / 0)
+    assert pool.stats() == {
+        "workers": 1,
+        "in_flight": 0,
+        "completed": 1,
+        "failed": 1,
+        "rejected": 1,
+    }
+    pool.shutdown()
@@ -0,0 +1,19 @@
+import asyncio
+import time
+
+import pytest
+from src.utils.rate_limit import TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert time.monotonic() - start < 0.02
+
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    # Five more tokens at 50 per second
+    assert time.monotonic() - start >= 0.09
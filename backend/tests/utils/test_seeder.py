@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.song import SongModel
+from src.repositories.song_repository import SongRepository
+from src.utils.seeder import SeenTrackIds, load_csv
+
+
+@pytest.mark.asyncio
+async def test_load_csv_dedupes_across_chunks(db_session: AsyncSession, tmp_path):
+    rows = []
+    for track_id, name in [
+        ("a", "First A"),
+        ("b", "First B"),
+        ("c", "Broken C"),
+        ("a", "Second A"),
+        ("d", "First D"),
+        ("b", "Second B"),
+    ]:
+        row = {c.name: None for c in SongModel.__table__.columns}
+        row.update(
+            track_id=track_id,
+            track_name=name,
+            track_artist="Artist",
+            track_popularity=50,
+            track_album_id="album_1",
+            track_album_name="Album",
+            track_album_release_date="2023-01-01",
+            danceability=0.5,
+            energy=0.5,
+            key=1,
+            loudness=-10.0,
+            mode=1,
+            speechiness=0.1,
+            acousticness=0.2,
+            instrumentalness=0.0,
+            liveness=0.1,
+            valence=0.5,
+            tempo="not a number" if track_id == "c" else 100.0,
+            duration_ms=200000,
+        )
+        rows.append(row)
+    csv_path = tmp_path / "songs.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+
+    # Two rows per chunk: the duplicates of "a" and "b" land in later chunks
+    loaded = await load_csv(db_session, str(csv_path), chunk_size=2)
+
+    songs = await SongRepository(db_session).get_all()
+    assert loaded == 3
+    assert {s.track_id: s.track_name for s in songs} == {
+        "a": "First A",
+        "b": "First B",
+        "d": "First D",
+    }
+    assert songs[0].playlist_name is None
+
+
+def test_seen_track_ids_matches_a_set_across_chunks():
+    rng = np.random.default_rng(0)
+    seen, reference = SeenTrackIds(), set()
+    for _ in range(40):
+        chunk = pd.Series([f"track_{i}" for i in rng.integers(0, 3000, 250)])
+        expected = [
+            t not in reference and t not in chunk.iloc[:i].values
+            for i, t in enumerate(chunk)
+        ]
+        assert seen.add(chunk).tolist() == expected
+        reference.update(chunk)
+    assert len(seen) == len(reference)
+    # Runs are merged as they come, so only a few are left to search
+    assert len(seen._runs) <= 12